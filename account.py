@@ -1,17 +1,9 @@
-from dotenv import dotenv_values
+import client
 
-config = dotenv_values(".env")
 def get_info():
-    import requests
-
-    url = "https://paper-api.alpaca.markets/v2/account"
-
-    headers = {"accept": "application/json", "APCA-API-KEY-ID": config["alpaca-key"], "APCA-API-SECRET-KEY": config["secret-key"]}
-
-    response = requests.get(url, headers=headers)
+    response = client.get(f"{client.BASE_URL}/v2/account", endpoint="account")
     print(response.text)
     return response.json()
 
 def get_cash():
     return get_info()["daytrading_buying_power"]
-    
\ No newline at end of file
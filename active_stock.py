@@ -1,18 +1,6 @@
-import requests
-
-from dotenv import dotenv_values
+from screener import MostActivesSource
 
 def active_stocks():
-    url = "https://data.alpaca.markets/v1beta1/screener/stocks/most-actives?by=volume&top=20"
-    config = dotenv_values(".env")
-    headers = {
-        "accept": "application/json",
-        "APCA-API-KEY-ID": config["alpaca-key"],
-        "APCA-API-SECRET-KEY": config["secret-key"]
-    }
-
-    response = requests.get(url, headers=headers)
-
-    print(response.text)
+    print(MostActivesSource(by="volume", top=20).poll())
 
-active_stocks()
\ No newline at end of file
+active_stocks()
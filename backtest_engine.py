@@ -0,0 +1,235 @@
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from hedge import SpyHedge
+
+DAY = np.timedelta64(1, "D")
+
+
+def _lookup_rows(dates, targets):
+    """Row of each target in dates, or -1 where the date is not a row of the panel."""
+    rows = np.searchsorted(dates, targets)
+    found = rows < len(dates)
+    found[found] = dates[rows[found]] == targets[found]
+    return np.where(found, rows, -1)
+
+
+def _position_sizes(entry_price, portfolio_size, max_shares):
+    """Shares per event and the notional to hedge for each.
+
+    Uncapped trades buy portfolio_size of stock and hedge the full
+    portfolio_size; capped trades hedge only what they actually hold.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = portfolio_size // entry_price
+    if max_shares is None:
+        return shares, portfolio_size
+    shares = np.minimum(shares, max_shares)
+    return shares, shares * entry_price
+
+
+def _hedge_ratios(spy_hedge, prices, trade_dates, cols, hedge_ratio):
+    if isinstance(hedge_ratio, str) and hedge_ratio == "beta":
+        return spy_hedge.betas(prices, trade_dates, np.maximum(cols, 0))
+    return np.broadcast_to(np.asarray(hedge_ratio, dtype=np.float64), len(trade_dates))
+
+
+def run_backtest(events, prices, fed_rates, portfolio_size, transaction_costs, overnight_costs,
+                 spy=None, rng=np.random, hedge_ratio=1.0, max_shares=None, draws=None, out=None):
+    """Backtest every event at once over a dates x tickers price panel.
+
+    Each trade buys at the trade-date open and sells at the close a random
+    1..max holding period later, drawn in event order from rng so a seeded run
+    matches the original per-row loop. Events whose entry or exit date is not a
+    trading day, or whose prices are missing, are skipped, as are zero-PnL trades.
+
+    With spy given, each trade is hedged by shorting hedge_ratio times its
+    notional in SPY; hedge_ratio may be a number, a per-event array or "beta".
+    'Hedge PnL' is that short's PnL and is added into 'Net PnL'.
+    max_shares optionally caps each event's share quantity (see sizing.py);
+    events capped to zero shares are not traded.
+
+    draws optionally gives one uint64 random value per event; holding periods
+    then come from those instead of rng, so each event's result depends only
+    on its own draw (see result_cache.py). The returned frame is indexed by
+    the events' index labels; with a TradeBuffer given as out, the trades are
+    appended to it instead and the buffer is returned.
+    """
+    dates = prices.dates
+    tickers = events["Ticker"].to_numpy()
+    trade_dates = pd.to_datetime(events["Trade Date"]).values.astype("datetime64[ns]")
+    cols = pd.Index(prices.tickers).get_indexer(tickers)
+
+    max_holding = (dates[-1] - trade_dates) // DAY
+    drawn = (cols >= 0) & (max_holding >= 1)
+    holding = np.zeros(len(events), dtype=np.int64)
+    if draws is None:
+        holding[drawn] = rng.randint(1, max_holding[drawn] + 1)
+    else:
+        holding[drawn] = 1 + np.asarray(draws, dtype=np.uint64)[drawn] % max_holding[drawn].astype(np.uint64)
+    exit_dates = trade_dates + holding * DAY
+
+    entry_rows = _lookup_rows(dates, trade_dates)
+    exit_rows = _lookup_rows(dates, exit_dates)
+    found = drawn & (entry_rows >= 0) & (exit_rows >= 0)
+    entry_price = np.where(found, prices.fields["Open"][entry_rows, cols], np.nan)
+    exit_price = np.where(found, prices.fields["Close"][exit_rows, cols], np.nan)
+    traded = found & ~np.isnan(entry_price) & ~np.isnan(exit_price)
+    shares, hedge_notional = _position_sizes(entry_price, portfolio_size, max_shares)
+    if max_shares is not None:
+        traded &= shares > 0
+
+    with np.errstate(invalid="ignore"):
+        pnl = (exit_price - entry_price) * shares
+        txn_costs = transaction_costs(shares)
+        overnight_cost = overnight_costs(shares * entry_price, fed_rates, holding)
+    net_pnl = pnl - txn_costs - overnight_cost
+
+    hedge = np.zeros(len(events))
+    if spy is not None:
+        spy_hedge = SpyHedge(spy)
+        ratio = _hedge_ratios(spy_hedge, prices, trade_dates, cols, hedge_ratio)
+        notional = np.broadcast_to(hedge_notional, len(events))[traded]
+        hedge[traded] = spy_hedge.pnl(trade_dates[traded], exit_dates[traded], notional, ratio[traded])
+        net_pnl = net_pnl + hedge
+
+    keep = traded & (net_pnl != 0)
+    if out is not None:
+        out.extend(
+            ticker=tickers[keep], entry_date=trade_dates[keep], exit_date=exit_dates[keep],
+            holding_days=holding[keep], entry_price=entry_price[keep], exit_price=exit_price[keep],
+            shares=np.broadcast_to(shares, len(events))[keep], pnl=pnl[keep], hedge_pnl=hedge[keep],
+            net_pnl=net_pnl[keep], transaction_costs=txn_costs[keep],
+        )
+        return out
+    return pd.DataFrame({
+        'Ticker': tickers[keep],
+        'Entry Date': trade_dates[keep],
+        'Exit Date': exit_dates[keep],
+        'Holding Period (Days)': holding[keep],
+        'Entry Price': entry_price[keep],
+        'Exit Price': exit_price[keep],
+        'Shares': np.broadcast_to(shares, len(events))[keep],
+        'PnL': pnl[keep],
+        'Hedge PnL': hedge[keep],
+        'Net PnL': net_pnl[keep],
+        'Transaction Costs': txn_costs[keep],
+    }, index=events.index[keep])
+
+
+# === Monte Carlo Holding-Period Simulation ===
+PATHS_PER_CHUNK = 250
+_context = None
+
+
+def _init_worker(context):
+    global _context
+    _context = context
+
+
+def _simulate_chunk(seed, n_paths):
+    """Net PnL for every event under n_paths holding-period draws (events x paths, NaN = no trade)."""
+    c = _context
+    rng = np.random.default_rng(seed)
+    high = np.maximum(c["max_holding"], 1)[:, None] + 1
+    holding = rng.integers(1, high, size=(len(high), n_paths))
+    exit_dates = c["trade_dates"][:, None] + holding * DAY
+
+    exit_rows = _lookup_rows(c["dates"], exit_dates.ravel()).reshape(holding.shape)
+    valid = c["tradable"][:, None] & (exit_rows >= 0)
+    exit_price = np.where(valid, c["closes"][exit_rows, c["cols"][:, None]], np.nan)
+
+    entry_price = c["entry_price"][:, None]
+    shares = c["shares"][:, None]
+    with np.errstate(invalid="ignore"):
+        pnl = (exit_price - entry_price) * shares
+        net = pnl - c["transaction_costs"](shares) - c["overnight_costs"](shares * entry_price, c["fed_rates"][:, None], holding)
+    if c["hedge"] is not None:
+        trade_dates = np.broadcast_to(c["trade_dates"][:, None], holding.shape).ravel()
+        ratio = np.broadcast_to(c["hedge_ratio"][:, None], holding.shape).ravel()
+        notional = np.broadcast_to(c["hedge_notional"][:, None], holding.shape).ravel()
+        hedge = c["hedge"].pnl(trade_dates, exit_dates.ravel(), notional, ratio)
+        net = net + hedge.reshape(holding.shape)
+    return np.where(valid & ~np.isnan(exit_price), net, np.nan)
+
+
+def simulate(events, prices, fed_rates, portfolio_size, transaction_costs, overnight_costs,
+             spy=None, n_paths=1000, seed=0, workers=None, hedge_ratio=1.0, max_shares=None):
+    """Evaluate n_paths seeded holding-period draws per event across a process pool.
+
+    Paths are split into fixed-size chunks with independent seeds, so results
+    depend only on seed and n_paths, not on the number of workers. Returns
+    (per_event, per_index) distribution summaries of net PnL.
+    """
+    dates = prices.dates
+    trade_dates = pd.to_datetime(events["Trade Date"]).values.astype("datetime64[ns]")
+    cols = pd.Index(prices.tickers).get_indexer(events["Ticker"].to_numpy())
+    safe_cols = np.maximum(cols, 0)
+    entry_rows = _lookup_rows(dates, trade_dates)
+    entry_price = np.where(entry_rows >= 0, prices.fields["Open"][entry_rows, safe_cols], np.nan)
+    max_holding = (dates[-1] - trade_dates) // DAY
+    tradable = (cols >= 0) & (entry_rows >= 0) & (max_holding >= 1) & ~np.isnan(entry_price)
+    shares, hedge_notional = _position_sizes(entry_price, portfolio_size, max_shares)
+    if max_shares is not None:
+        tradable &= shares > 0
+    hedge = SpyHedge(spy) if spy is not None else None
+
+    context = {
+        "dates": dates,
+        "closes": prices.fields["Close"],
+        "cols": safe_cols,
+        "trade_dates": trade_dates,
+        "max_holding": max_holding,
+        "tradable": tradable,
+        "entry_price": entry_price,
+        "shares": shares,
+        "fed_rates": np.broadcast_to(np.asarray(fed_rates, dtype=np.float64), len(events)),
+        "hedge_notional": np.broadcast_to(np.asarray(hedge_notional, dtype=np.float64), len(events)),
+        "transaction_costs": transaction_costs,
+        "overnight_costs": overnight_costs,
+        "hedge": hedge,
+        "hedge_ratio": _hedge_ratios(hedge, prices, trade_dates, cols, hedge_ratio) if hedge else None,
+    }
+    sizes = [min(PATHS_PER_CHUNK, n_paths - i) for i in range(0, n_paths, PATHS_PER_CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context,)) as pool:
+        paths = np.hstack(list(pool.map(_simulate_chunk, seeds, sizes)))
+
+    return summarize_paths(events, paths)
+
+
+def _distribution(values, axis):
+    # Events with no traded path give all-NaN rows; their stats are simply NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        p5, p50, p95 = np.nanpercentile(values, [5, 50, 95], axis=axis)
+        return {
+            'Mean': np.nanmean(values, axis=axis),
+            'Std': np.nanstd(values, axis=axis),
+            'P5': p5,
+            'Median': p50,
+            'P95': p95,
+        }
+
+
+def summarize_paths(events, paths):
+    """Per-event and per-index net PnL distributions from an events x paths matrix."""
+    traded = ~np.isnan(paths)
+    per_event = pd.DataFrame({
+        'Ticker': events["Ticker"].to_numpy(),
+        'Trade Date': pd.to_datetime(events["Trade Date"]).values,
+        'Index Change': events["Index Change"].to_numpy(),
+        **_distribution(paths, axis=1),
+        'Win Rate': (paths > 0).sum(axis=1) / np.maximum(traded.sum(axis=1), 1),
+        'Traded Paths': traded.sum(axis=1),
+    })
+
+    rows = []
+    index_names = events["Index Change"].to_numpy()
+    for name in pd.unique(index_names):
+        totals = np.nansum(paths[index_names == name], axis=0)
+        rows.append({'Index Change': name, **{k: float(v) for k, v in _distribution(totals, axis=0).items()}})
+    return per_event, pd.DataFrame(rows)
@@ -1,17 +1,8 @@
-import requests
-from dotenv import dotenv_values
-
-config = dotenv_values(".env")
+import quotes
 
 def get_bars(stock, timeframe, limit):
-    import requests
-
-    url = f"https://data.alpaca.markets/v2/stocks/{stock}/quotes/latest?feed=iex"
-
-    headers = {"accept": "application/json", "APCA-API-KEY-ID": config["alpaca-key"],
-        "APCA-API-SECRET-KEY": config["secret-key"]}
-
-    response = requests.get(url, headers=headers)
+    """Latest IEX quote for stock, served from the shared batched quote cache.
 
-    print(response.text)
-    return response.json()
\ No newline at end of file
+    timeframe and limit are kept for compatibility and are not used.
+    """
+    return {"symbol": stock, "quote": quotes.get_quote(stock)}
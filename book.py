@@ -0,0 +1,79 @@
+import threading
+
+import client
+
+OPEN_EVENTS = {"new", "accepted", "pending_new", "partial_fill"}
+CLOSED_EVENTS = {"fill", "canceled", "expired", "rejected", "done_for_day", "replaced"}
+
+
+class AccountBook:
+    """In-memory buying power, positions and open orders.
+
+    Loaded once from REST, then kept current from trade_updates events so order
+    sizing never waits on the network. reconcile() re-syncs with the broker.
+    """
+
+    def __init__(self):
+        self.buying_power = 0.0
+        self.cash = 0.0
+        self.positions = {}
+        self.open_orders = {}
+        self._lock = threading.Lock()
+
+    def _get(self, path, endpoint, **kwargs):
+        response = client.get(f"{client.BASE_URL}{path}", endpoint=endpoint, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def load(self):
+        """Replace the book with the broker's state; raises on any non-2xx response, leaving it unchanged."""
+        account = self._get("/v2/account", "account")
+        positions = self._get("/v2/positions", "positions")
+        orders = self._get("/v2/orders", "orders", params={"status": "open"})
+        with self._lock:
+            self.buying_power = float(account["daytrading_buying_power"])
+            self.cash = float(account["cash"])
+            self.positions = {
+                p["symbol"]: {"qty": float(p["qty"]), "avg_entry_price": float(p["avg_entry_price"])}
+                for p in positions
+            }
+            self.open_orders = {o["id"]: o for o in orders}
+        return self
+
+    reconcile = load
+
+    def apply_trade_update(self, data):
+        """Apply one trade_updates event payload ({"event": ..., "order": {...}, ...})."""
+        event = data["event"]
+        order = data["order"]
+        symbol = order["symbol"]
+        with self._lock:
+            if event in ("fill", "partial_fill"):
+                qty = float(data["qty"])
+                price = float(data["price"])
+                sign = 1 if order["side"] == "buy" else -1
+                self.buying_power -= sign * qty * price
+                self.cash -= sign * qty * price
+
+                position = self.positions.get(symbol, {"qty": 0.0, "avg_entry_price": price})
+                new_qty = float(data.get("position_qty", position["qty"] + sign * qty))
+                if new_qty == 0:
+                    self.positions.pop(symbol, None)
+                else:
+                    if sign > 0 and position["qty"] >= 0:
+                        cost = position["qty"] * position["avg_entry_price"] + qty * price
+                        position["avg_entry_price"] = cost / (position["qty"] + qty)
+                    position["qty"] = new_qty
+                    self.positions[symbol] = position
+
+            if event in OPEN_EVENTS:
+                self.open_orders[order["id"]] = order
+            elif event in CLOSED_EVENTS:
+                self.open_orders.pop(order["id"], None)
+
+    def position_qty(self, symbol):
+        position = self.positions.get(symbol)
+        return position["qty"] if position else 0.0
+
+
+book = AccountBook()
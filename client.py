@@ -0,0 +1,80 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import dotenv_values
+
+# Credentials are read once for every helper that talks to Alpaca
+config = dotenv_values(".env")
+
+BASE_URL = "https://paper-api.alpaca.markets"
+DATA_URL = "https://data.alpaca.markets"
+
+POOL_SIZE = 10  # Until a script calls configure() with its own concurrency
+
+# (connect, read) timeouts in seconds per endpoint
+TIMEOUTS = {
+    "account": (3.05, 5),
+    "clock": (3.05, 5),
+    "quotes": (3.05, 2),
+    "orders": (3.05, 10),
+    "positions": (3.05, 10),
+    "screener": (3.05, 10),
+    "bars": (3.05, 30),
+    "assets": (3.05, 30),
+    "default": (3.05, 10),
+}
+
+_session = None
+_lock = threading.Lock()
+
+
+def headers():
+    """Authentication headers shared by all Alpaca requests."""
+    return {
+        "accept": "application/json",
+        "APCA-API-KEY-ID": config["alpaca-key"],
+        "APCA-API-SECRET-KEY": config["secret-key"],
+    }
+
+
+def configure(pool_size):
+    """Resize the keep-alive connection pool, e.g. to the number of worker threads."""
+    global _session, POOL_SIZE
+    with _lock:
+        POOL_SIZE = pool_size
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_session():
+    """Return the shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(headers())
+                _session = session
+    return _session
+
+
+def request(method, url, endpoint="default", **kwargs):
+    kwargs.setdefault("timeout", TIMEOUTS.get(endpoint, TIMEOUTS["default"]))
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url, endpoint="default", **kwargs):
+    return request("GET", url, endpoint, **kwargs)
+
+
+def post(url, endpoint="default", **kwargs):
+    return request("POST", url, endpoint, **kwargs)
+
+
+def delete(url, endpoint="default", **kwargs):
+    return request("DELETE", url, endpoint, **kwargs)
@@ -0,0 +1,20 @@
+from sizing import position_limits
+
+TRANSACTION_COST = 0.01  # $ per share
+LONG_SPREAD = 0.015  # Financing spread over fed funds for long positions
+SHORT_SPREAD = 0.01  # And for short positions
+
+
+def calculate_transaction_costs(shares, cost_per_share=TRANSACTION_COST):
+    return shares * cost_per_share
+
+
+def overnight_costs(position, fed_rate, holding_period, is_long=True, long_spread=LONG_SPREAD):
+    rate = (fed_rate / 100) + (long_spread if is_long else SHORT_SPREAD)
+    return (position * rate * holding_period) / 365
+
+
+def allocate_positions(prices, events, portfolio_size):
+    """Per-event share cap: 1% of the ADV over up to 20 days known before each trade date
+    (at least 5, else no trade), and at most an equal share of portfolio_size across events."""
+    return position_limits(events, prices, capital=portfolio_size / len(events))
@@ -0,0 +1,248 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from market_open import MIN_REFRESH_INTERVAL, clock, marketOpen
+from stream import QuoteStream, TradeUpdateStream
+from orders import gateway
+
+ORDER_WORKERS = 4  # Blocking REST calls run on this many threads, whatever the symbol count
+RECONCILE_INTERVAL = 300  # Seconds between account book reconciles
+
+TERMINAL_EVENTS = {"fill", "canceled", "expired", "rejected", "done_for_day"}
+EARLY_UPDATES = 256  # Terminal updates kept for orders whose future does not exist yet
+ORDER_EVENT_TIMEOUT = 30  # Seconds without a trade update before checking an order over REST
+# Terminal order statuses from GET /v2/orders and the trade_updates event each stands for
+STATUS_EVENTS = {"filled": "fill", "canceled": "canceled", "expired": "expired",
+                 "rejected": "rejected", "done_for_day": "done_for_day"}
+
+
+class ScalpEngine:
+    """Runs one entry -> monitor -> exit state machine per symbol on a single event loop.
+
+    order_size(symbol, price) returns the order amount, in dollars or shares per
+    size_in ("notional" or "qty"); it may block, so it runs on the engine's small
+    worker pool. Orders go through the shared rate-limited gateway.
+    When an AccountBook is given it is kept current from trade_updates while the
+    engine runs and reconciled against REST every RECONCILE_INTERVAL seconds.
+
+    exit_mode "monitor" watches quotes and sends a market sell at either
+    threshold; "bracket" submits a bracket order whose take-profit and stop-loss
+    legs live at the broker and waits for their fill events instead.
+
+    With a Screener given, symbols it adds start trading while the engine runs
+    and symbols it drops stop once their current trade has finished.
+    """
+
+    def __init__(self, symbols, order_size, profit_target, loss_cutoff, cooldown=60, stream=None, book=None,
+                 size_in="notional", exit_mode="monitor", screener=None):
+        self.symbols = list(symbols)
+        self.order_size = order_size
+        self.size_in = size_in
+        self.profit_target = profit_target
+        self.loss_cutoff = loss_cutoff
+        self.cooldown = cooldown
+        self.stream = stream or QuoteStream(self.symbols)
+        self.book = book
+        self.exit_mode = exit_mode
+        self.screener = screener
+        self.state = {symbol: "idle" for symbol in self.symbols}
+        self._trades = {}
+        self._retiring = set()
+        self._executor = ThreadPoolExecutor(max_workers=ORDER_WORKERS)
+        self._order_events = {}
+        self._early_updates = {}
+
+    def _order_event(self, order_id):
+        """Future resolved with the order's terminal trade update, whichever side arrives first."""
+        future = self._order_events.get(order_id)
+        if future is None:
+            future = self._order_events[order_id] = asyncio.get_running_loop().create_future()
+            early = self._early_updates.pop(order_id, None)
+            if early is not None:
+                future.set_result(early)
+        return future
+
+    def _on_trade_update(self, data):
+        if self.book is not None:
+            self.book.apply_trade_update(data)
+        if data["event"] in TERMINAL_EVENTS:
+            order_id = data["order"]["id"]
+            future = self._order_events.get(order_id)
+            if future is None:
+                # May belong to an order still being submitted, or to one this engine never sees
+                self._early_updates[order_id] = data
+                if len(self._early_updates) > EARLY_UPDATES:
+                    del self._early_updates[next(iter(self._early_updates))]
+            elif not future.done():
+                future.set_result(data)
+
+    async def _order_updates(self, order_ids):
+        """{order_id: terminal update} for the first of order_ids to finish.
+
+        If the trade_updates stream says nothing for ORDER_EVENT_TIMEOUT seconds,
+        each pending order is looked up over REST, so a lost event cannot hang
+        its symbol.
+        """
+        futures = {self._order_event(order_id): order_id for order_id in order_ids}
+        while True:
+            done, pending = await asyncio.wait(futures, timeout=ORDER_EVENT_TIMEOUT,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if done:
+                return {futures[future]: future.result() for future in done}
+            for future in pending:
+                try:
+                    order = await self._call(gateway.get_order, futures[future])
+                except Exception as e:
+                    print(f"Error looking up order {futures[future]}: {e}")
+                    continue
+                if order.get("status") in STATUS_EVENTS and not future.done():
+                    future.set_result({"event": STATUS_EVENTS[order["status"]], "order": order,
+                                       "price": order.get("filled_avg_price")})
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _next_price(self, symbol):
+        quote = await self.stream.wait(symbol)
+        return float(quote["bp"])
+
+    async def _monitored_trade(self, symbol, entry_price, qty):
+        await gateway.submit(symbol, 'buy', type='market', time_in_force='day', **{self.size_in: qty})
+        print(f"Bought {qty} of {symbol} at {entry_price}")
+
+        # Monitor
+        self.state[symbol] = "monitor"
+        while True:
+            new_price = await self._next_price(symbol)
+            if new_price >= entry_price * (1 + self.profit_target):
+                reason = "for a profit"
+                break
+            if new_price <= entry_price * (1 - self.loss_cutoff):
+                reason = "to cut loss"
+                break
+
+        # Exit
+        self.state[symbol] = "exit"
+        await gateway.submit(symbol, 'sell', type='market', time_in_force='day', **{self.size_in: qty})
+        print(f"Sold {qty} of {symbol} at {new_price} {reason}")
+
+    async def _bracket_trade(self, symbol, entry_price, qty):
+        if self.size_in == "notional":
+            qty = int(qty // entry_price)  # Bracket orders need whole shares
+        if qty < 1:
+            print(f"Insufficient funds to trade {symbol}.")
+            return
+
+        order = await gateway.submit_bracket(symbol, qty, entry_price, self.profit_target, self.loss_cutoff)
+        if "id" not in order:
+            raise RuntimeError(order.get("message", order))
+        entry = (await self._order_updates([order["id"]]))[order["id"]]
+        self._order_events.pop(order["id"], None)
+        if entry["event"] != "fill":
+            print(f"Entry order for {symbol} {entry['event']}")
+            return
+        print(f"Bought {qty} of {symbol} at {entry['price']}")
+
+        # Wait for the broker to fill one exit leg; the other is cancelled with it
+        self.state[symbol] = "monitor"
+        legs = {leg["id"]: leg for leg in order.get("legs") or []}
+        try:
+            while legs:
+                for leg_id, exit_update in (await self._order_updates(legs)).items():
+                    leg = legs.pop(leg_id)
+                    if exit_update["event"] == "fill":
+                        reason = "for a profit" if leg["type"] == "limit" else "to cut loss"
+                        print(f"Sold {qty} of {symbol} at {exit_update['price']} {reason}")
+                        return
+        finally:
+            for leg in order.get("legs") or []:
+                self._order_events.pop(leg["id"], None)
+
+    async def trade_symbol(self, symbol):
+        first_entry = True  # The stream may still hold the previous session's last quote
+        while symbol not in self._retiring:
+            try:
+                # Entry
+                self.state[symbol] = "entry"
+                quote = None if first_entry else self.stream.latest.get(symbol)
+                first_entry = False
+                entry_price = float(quote["bp"]) if quote else await self._next_price(symbol)
+                qty = await self._call(self.order_size, symbol, entry_price)
+                if self.exit_mode == "bracket":
+                    await self._bracket_trade(symbol, entry_price, qty)
+                else:
+                    await self._monitored_trade(symbol, entry_price, qty)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error trading {symbol}: {e}")
+
+            self.state[symbol] = "cooldown"
+            await asyncio.sleep(self.cooldown)
+
+        # Retired by the screener
+        self._retiring.discard(symbol)
+        self._trades.pop(symbol, None)
+        self.state.pop(symbol, None)
+        self.symbols.remove(symbol)
+        await self.stream.unsubscribe([symbol])
+        print(f"Stopped trading {symbol}")
+
+    async def add_symbol(self, symbol):
+        """Start trading symbol while the engine runs."""
+        self._retiring.discard(symbol)
+        if symbol in self._trades:
+            return
+        if symbol not in self.symbols:
+            self.symbols.append(symbol)
+        self.state[symbol] = "idle"
+        await self.stream.subscribe([symbol])
+        self._trades[symbol] = asyncio.create_task(self.trade_symbol(symbol))
+
+    def retire_symbol(self, symbol):
+        """Stop trading symbol once its current trade, if any, is finished."""
+        if symbol in self._trades:
+            self._retiring.add(symbol)
+
+    async def _follow_screener(self):
+        async for added, dropped in self.screener.updates():
+            print(f"Screener added {added}, dropped {dropped}")
+            for symbol in dropped:
+                self.retire_symbol(symbol)
+            for symbol in added:
+                await self.add_symbol(symbol)
+
+    async def _reconcile(self):
+        while True:
+            await asyncio.sleep(RECONCILE_INTERVAL)
+            try:
+                await self._call(self.book.reconcile)
+            except Exception as e:
+                print(f"Error reconciling account: {e}")
+
+    async def run(self):
+        """Trade every symbol until the market closes."""
+        tasks = [asyncio.create_task(self.stream.run())]
+        if self.book is not None or self.exit_mode == "bracket":
+            tasks.append(asyncio.create_task(TradeUpdateStream(self._on_trade_update).run()))
+        if self.book is not None:
+            tasks.append(asyncio.create_task(self._reconcile()))
+        if self.screener is not None:
+            tasks.append(asyncio.create_task(self._follow_screener()))
+        self._trades = {symbol: asyncio.create_task(self.trade_symbol(symbol)) for symbol in self.symbols}
+        try:
+            # The clock is cached, so this only reaches the broker at the close; either call may
+            # refresh it, so both run off the loop, and the floor stops a spin right after a boundary
+            while await self._call(marketOpen):
+                await asyncio.sleep(max(await self._call(clock.seconds_until_change), MIN_REFRESH_INTERVAL))
+        finally:
+            tasks += self._trades.values()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._trades = {}
+            self._retiring.clear()
+            self._order_events.clear()
+            self._early_updates.clear()
+            for symbol in self.symbols:
+                self.state[symbol] = "idle"
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from events import load_events
+from hedge import SpyHedge
+from price_store import PriceStore
+
+# === Parameters ===
+START_DATE = '2022-05-01'
+END_DATE = '2024-11-01'
+WINDOWS = {'Announced': (-5, 10), 'Trade Date': (-10, 5)}  # Trading days around each date
+GROUPS = ['Index Change', 'Action', 'Sector']
+HORIZONS = [1, 3, 5]  # Days after each date shown in the summary
+
+
+# === Returns and Windows ===
+def daily_returns(prices, spy):
+    """Close-to-close returns (dates x tickers) and SPY's returns on the same dates; row 0 is NaN."""
+    closes = prices.fields["Close"]
+    spy_closes = spy["Close"].reindex(prices.index).to_numpy(dtype=np.float64)
+    stock = np.full(closes.shape, np.nan)
+    market = np.full(len(spy_closes), np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stock[1:] = closes[1:] / closes[:-1] - 1
+        market[1:] = spy_closes[1:] / spy_closes[:-1] - 1
+    return stock, market
+
+
+def anchor_rows(dates, event_dates):
+    """Row of the first trading day on or after each event date, i.e. relative day 0."""
+    return np.searchsorted(dates, pd.to_datetime(event_dates).values.astype("datetime64[ns]"), "left")
+
+
+def gather_windows(arrays, rows, cols, days):
+    """events x days x fields stack of each array at (row + day, col).
+
+    2-D arrays are dates x tickers, 1-D arrays are per date (e.g. SPY). Cells
+    outside the panel, or for tickers not in it, are NaN.
+    """
+    idx = rows[:, None] + days[None, :]
+    inside = (idx >= 0) & (idx < len(arrays[0])) & (cols[:, None] >= 0)
+    idx = np.where(inside, idx, 0)
+    safe_cols = np.maximum(cols, 0)[:, None]
+    window = np.stack([a[idx, safe_cols] if a.ndim == 2 else a[idx] for a in arrays], axis=-1)
+    window[~inside] = np.nan
+    return window
+
+
+# === Abnormal Returns ===
+def abnormal_returns(events, prices, spy, anchor='Trade Date', window=(-5, 10), beta=False, returns=None):
+    """Abnormal returns (events x days) around the anchor date column, and the relative days.
+
+    Abnormal return is the stock's return minus SPY's, or minus beta times
+    SPY's with beta=True (betas estimated over the days before each anchor).
+    Pass returns from daily_returns() to reuse them across calls.
+    """
+    stock, market = returns if returns is not None else daily_returns(prices, spy)
+    days = np.arange(window[0], window[1] + 1)
+    cols = pd.Index(prices.tickers).get_indexer(events["Ticker"].to_numpy())
+    rows = anchor_rows(prices.dates, events[anchor])
+    window_returns = gather_windows([stock, market], rows, cols, days)
+    ratio = 1.0
+    if beta:
+        ratio = SpyHedge(spy).betas(prices, prices.dates[np.minimum(rows, len(prices.dates) - 1)],
+                                   np.maximum(cols, 0))[:, None]
+    return window_returns[..., 0] - ratio * window_returns[..., 1], days
+
+
+def average_car(events, ar, days, by=GROUPS):
+    """Cumulative average abnormal return per group value (rows) by relative day (columns).
+
+    Each event's CAR starts at the first day of the window; days with no
+    return are left out of that day's average. 'Events' counts the events
+    with any return in the window.
+    """
+    car = np.where(np.isnan(ar), np.nan, np.nancumsum(ar, axis=1))
+    has_car = ~np.isnan(car)
+    frames = []
+    for column in by:
+        codes, keys = pd.factorize(events[column], sort=True)
+        ok = codes >= 0
+        sums = np.zeros((len(keys), len(days)))
+        counts = np.zeros((len(keys), len(days)))
+        np.add.at(sums, codes[ok], np.nan_to_num(car[ok]))
+        np.add.at(counts, codes[ok], has_car[ok])
+        n_events = np.bincount(codes[ok], weights=has_car[ok].any(axis=1), minlength=len(keys))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frame = pd.DataFrame(sums / counts, columns=days)
+        frame.insert(0, 'Events', n_events.astype(np.int64))
+        frame.index = pd.MultiIndex.from_arrays([[column] * len(keys), keys], names=['Group', 'Value'])
+        frames.append(frame)
+    return pd.concat(frames)
+
+
+def announcement_drift(events, prices, spy, returns=None):
+    """Market-adjusted return from the announcement-day close to the close before the trade date.
+
+    Abnormal returns are prefix-summed down the whole panel once, so each
+    event's drift is one difference regardless of the gap between its dates.
+    NaN where the gap has no full trading day or the ticker is not in the panel.
+    """
+    stock, market = returns if returns is not None else daily_returns(prices, spy)
+    ar = np.nan_to_num(stock - market[:, None])
+    prefix = np.vstack([np.zeros((1, ar.shape[1])), np.cumsum(ar, axis=0)])
+    cols = pd.Index(prices.tickers).get_indexer(events["Ticker"].to_numpy())
+    first = anchor_rows(prices.dates, events['Announced']) + 1
+    end = anchor_rows(prices.dates, events['Trade Date'])  # Sum rows first .. end - 1
+    ok = (cols >= 0) & (end > first) & (end <= len(prices.dates))
+    safe_cols = np.maximum(cols, 0)
+    first, end = np.where(ok, first, 0), np.where(ok, end, 0)
+    return np.where(ok, prefix[end, safe_cols] - prefix[first, safe_cols], np.nan)
+
+
+def event_study(events, prices, spy, windows=WINDOWS, by=GROUPS, beta=False):
+    """Grouped cumulative abnormal returns around each anchor date: {anchor: frame}."""
+    returns = daily_returns(prices, spy)
+    study = {}
+    for anchor, window in windows.items():
+        ar, days = abnormal_returns(events, prices, spy, anchor, window, beta, returns)
+        study[anchor] = average_car(events, ar, days, by)
+    return study
+
+
+# === Main Execution ===
+if __name__ == "__main__":
+    events = load_events().frame
+    tickers = events['Ticker'].unique().tolist()
+    store = PriceStore()
+    store.ensure(tickers + ['SPY'], START_DATE, END_DATE)
+    prices = store.panel(tickers, START_DATE, END_DATE)
+    spy = store.frame('SPY', START_DATE, END_DATE)
+
+    for anchor, car in event_study(events, prices, spy).items():
+        print(f"\nCumulative abnormal return around {anchor} (days {', '.join(map(str, HORIZONS))}):")
+        print(car[['Events'] + HORIZONS].to_string(float_format=lambda x: f"{x:.2%}"))
+
+    events['Drift'] = announcement_drift(events, prices, spy)
+    print("\nMean announce-to-trade drift:")
+    print(events.groupby(GROUPS[:2])['Drift'].agg(['count', 'mean']).to_string())
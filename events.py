@@ -0,0 +1,138 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+EVENTS_FILE = "indexInfo.csv"
+CACHE_DIR = os.path.join("cache", "events")
+DATE_COLUMNS = ["Announced", "Trade Date"]
+TEXT_COLUMNS = ["Index Change", "Ticker", "Action", "Sector"]
+NUMBER_COLUMNS = ["Last Px", "Shs to Trade", "$MM to Trade", "ADV to Trade"]  # ADV to Trade stays in percent
+DATE_FORMAT = "%m/%d/%Y"
+CACHE_VERSION = 2  # Bump whenever the cache layout changes
+
+# The source mixes short and GICS sector names; map everything to the GICS name
+SECTOR_NAMES = {
+    "Info Tech": "Information Technology",
+    "Comm Svcs": "Communication Services",
+    "Cons Disc": "Consumer Discretionary",
+    "Cons Stap": "Consumer Staples",
+    "Healthcare": "Health Care",
+}
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def parse_events(path):
+    """Read the raw CSV and convert every column to a numeric, date or string dtype."""
+    raw = pd.read_csv(path, dtype=str)
+    frame = pd.DataFrame(index=raw.index)
+    for column in raw.columns:
+        values = raw[column].str.strip()
+        if column in DATE_COLUMNS:
+            frame[column] = pd.to_datetime(values, format=DATE_FORMAT)
+        elif column in NUMBER_COLUMNS:
+            frame[column] = pd.to_numeric(values.str.replace(r"[$,%]", "", regex=True), errors="coerce")
+        else:
+            frame[column] = values
+    if "Sector" in frame:
+        frame["Sector"] = frame["Sector"].replace(SECTOR_NAMES)
+    return frame
+
+
+class EventTable:
+    """Typed index-change events with precomputed lookups for filtered views.
+
+    Row positions are grouped once per text column and the trade dates are
+    argsorted once, so select() only intersects position sets. Rows keep their
+    file order, which the seeded holding-period draws depend on.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame.reset_index(drop=True)
+        self.groups = {
+            column: self.frame.groupby(column, sort=False).indices
+            for column in TEXT_COLUMNS if column in self.frame
+        }
+        self._date_order = {}
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _window(self, column, start, end):
+        if column not in self._date_order:
+            values = self.frame[column].values.astype("datetime64[ns]")
+            order = np.argsort(values, kind="stable")
+            self._date_order[column] = (order, values[order])
+        order, values = self._date_order[column]
+        lo = 0 if start is None else np.searchsorted(values, np.datetime64(pd.Timestamp(start), "ns"), "left")
+        hi = len(values) if end is None else np.searchsorted(values, np.datetime64(pd.Timestamp(end), "ns"), "right")
+        return order[lo:hi]
+
+    def _rows(self, column, keys):
+        if isinstance(keys, str):
+            keys = [keys]
+        if column == "Sector":
+            keys = [SECTOR_NAMES.get(key, key) for key in keys]
+        groups = self.groups[column]
+        return np.concatenate([groups.get(key, np.empty(0, dtype=np.intp)) for key in keys])
+
+    def select(self, index=None, action=None, sector=None, start=None, end=None, on="Trade Date"):
+        """Events matching every given filter, in file order.
+
+        index, action and sector take one value or a list ('All' for index means
+        no filter); start and end bound the `on` date column, both inclusive.
+        """
+        mask = np.ones(len(self.frame), dtype=bool)
+        for column, keys in (("Index Change", index), ("Action", action), ("Sector", sector)):
+            if keys is None or (column == "Index Change" and keys == "All"):
+                continue
+            keep = np.zeros(len(self.frame), dtype=bool)
+            keep[self._rows(column, keys)] = True
+            mask &= keep
+        if start is not None or end is not None:
+            keep = np.zeros(len(self.frame), dtype=bool)
+            keep[self._window(on, start, end)] = True
+            mask &= keep
+        return self.frame[mask]
+
+
+def load_events(path=EVENTS_FILE, cache_dir=CACHE_DIR):
+    """Typed events for path, from a columnar NumPy cache keyed on the file's hash.
+
+    The first load of a given file parses the CSV and writes one array per
+    column, plus a missing-value mask per text column since NumPy strings
+    cannot hold NaN; later loads of the same bytes read those arrays directly.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, f"{name}_{_file_hash(path)}_v{CACHE_VERSION}.npz")
+    if os.path.exists(cache_path):
+        with np.load(cache_path, allow_pickle=False) as data:
+            columns = [str(c) for c in data["__columns__"]]
+            frame = pd.DataFrame({column: data[column] for column in columns})
+            for column in columns:
+                if f"{column}__missing" in data:
+                    frame[column] = frame[column].where(~data[f"{column}__missing"])
+        return EventTable(frame)
+
+    frame = parse_events(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    arrays = {
+        column: frame[column].fillna("").to_numpy(dtype=str) if frame[column].dtype.kind not in "fiM" else frame[column].to_numpy()
+        for column in frame.columns
+    }
+    arrays.update({
+        f"{column}__missing": frame[column].isna().to_numpy()
+        for column in frame.columns if frame[column].dtype.kind not in "fiM"
+    })
+    tmp_path = cache_path + ".tmp.npz"
+    np.savez(tmp_path, __columns__=np.array(frame.columns, dtype=str), **arrays)
+    os.replace(tmp_path, cache_path)
+    return EventTable(frame)
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import random
+from datetime import datetime, timezone
+
+import websockets
+
+# Local stand-in for the Alpaca market data stream.
+# Run `python fake_feed.py` and set stream-url=ws://localhost:8765 in .env
+HOST = "localhost"
+PORT = 8765
+INTERVAL = 0.1  # Seconds between quote bursts
+BAR_INTERVAL = 60.0  # Seconds between minute bars
+START_PRICE = 100.0
+TICK = 0.0002  # Per-update relative price step
+
+
+async def _read_subscriptions(ws, quotes, bars):
+    # Apply every subscribe/unsubscribe for the life of the connection
+    async for message in ws:
+        msg = json.loads(message)
+        action = msg.get("action")
+        for channel, symbols in (("quotes", quotes), ("bars", bars)):
+            for symbol in msg.get(channel, []):
+                if action == "subscribe" and symbol not in symbols:
+                    symbols.append(symbol)
+                elif action == "unsubscribe" and symbol in symbols:
+                    symbols.remove(symbol)
+        if action in ("subscribe", "unsubscribe"):
+            await ws.send(json.dumps([{"T": "subscription", "quotes": quotes, "bars": bars}]))
+
+
+async def handler(ws, interval=INTERVAL, bar_interval=BAR_INTERVAL):
+    await ws.send(json.dumps([{"T": "success", "msg": "connected"}]))
+    await ws.recv()  # auth message; any credentials are accepted
+    await ws.send(json.dumps([{"T": "success", "msg": "authenticated"}]))
+
+    quotes, bars = [], []
+    prices = {}
+    candles = {}  # symbol -> [open, high, low, close, volume] since the last bar
+    reader = asyncio.create_task(_read_subscriptions(ws, quotes, bars))
+    loop = asyncio.get_running_loop()
+    next_bar = loop.time() + bar_interval
+    try:
+        while not reader.done():
+            batch = []
+            now = datetime.now(timezone.utc)
+            for symbol in dict.fromkeys(quotes + bars):
+                mid = prices.get(symbol, START_PRICE) * (1 + random.uniform(-TICK, TICK))
+                prices[symbol] = mid
+                size = random.randint(1, 10)
+                candle = candles.setdefault(symbol, [mid, mid, mid, mid, 0])
+                candle[1], candle[2], candle[3] = max(candle[1], mid), min(candle[2], mid), mid
+                candle[4] += size
+                if symbol in quotes:
+                    batch.append({
+                        "T": "q",
+                        "S": symbol,
+                        "bp": round(mid - 0.01, 2),
+                        "bs": size,
+                        "ap": round(mid + 0.01, 2),
+                        "as": random.randint(1, 10),
+                        "t": now.isoformat(),
+                    })
+
+            if loop.time() >= next_bar:
+                next_bar += bar_interval
+                start = now.replace(second=0, microsecond=0)
+                for symbol in bars:
+                    o, h, l, c, v = candles.pop(symbol, [prices[symbol]] * 4 + [0])
+                    batch.append({
+                        "T": "b", "S": symbol, "o": round(o, 2), "h": round(h, 2), "l": round(l, 2),
+                        "c": round(c, 2), "v": v, "t": start.isoformat().replace("+00:00", "Z"),
+                    })
+                candles.clear()
+
+            if batch:
+                await ws.send(json.dumps(batch))
+            await asyncio.sleep(interval)
+    finally:
+        reader.cancel()
+
+
+async def serve(host=HOST, port=PORT):
+    async with websockets.serve(handler, host, port):
+        print(f"Fake quote and bar feed listening on ws://{host}:{port}")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+BETA_WINDOW = 60  # Trading days of returns used for each beta
+MIN_BETA_OBSERVATIONS = 20  # Fewer overlapping returns fall back to a 1:1 hedge
+
+
+class SpyHedge:
+    """SPY opens and closes as date-indexed arrays.
+
+    The hedge for a trade only needs the first open on/after entry and the last
+    close on/before exit, so a whole vector of trades is two searchsorted calls.
+    """
+
+    def __init__(self, spy):
+        self.dates = spy.index.values.astype("datetime64[ns]")
+        self.opens = spy["Open"].to_numpy(dtype=np.float64)
+        self.closes = spy["Close"].to_numpy(dtype=np.float64)
+
+    def pnl(self, entry_dates, exit_dates, notional, ratio=1.0):
+        """PnL of shorting ratio * notional of SPY over each (entry, exit) window.
+
+        Positive when SPY falls, so it is added to the trade's PnL. Windows
+        covering fewer than two SPY rows get no hedge.
+        """
+        first = np.searchsorted(self.dates, entry_dates, "left")
+        last = np.searchsorted(self.dates, exit_dates, "right") - 1
+        ok = last - first + 1 >= 2
+        first, last = np.where(ok, first, 0), np.where(ok, last, 0)
+        entry_price = self.opens[first]
+        hedge_size = notional * ratio / entry_price
+        return np.where(ok, hedge_size * (entry_price - self.closes[last]), 0.0)
+
+    def betas(self, prices, as_of_dates, cols, window=BETA_WINDOW):
+        """Beta of each ticker column to SPY over the window ending the day before as_of.
+
+        Daily close-to-close returns are turned into prefix sums once, so every
+        (date, ticker) beta is a constant-time difference of those sums.
+        """
+        closes = prices.fields["Close"]
+        spy_closes = pd.Series(self.closes, index=self.dates).reindex(prices.dates).to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stock = closes[1:] / closes[:-1] - 1
+            market = (spy_closes[1:] / spy_closes[:-1] - 1)[:, None]
+        valid = ~np.isnan(stock) & ~np.isnan(market)
+        x = np.where(valid, market, 0.0)
+        y = np.where(valid, stock, 0.0)
+
+        def prefix(a):
+            return np.vstack([np.zeros((1, a.shape[1])), np.cumsum(a, axis=0)])
+
+        n, sx, sy, sxx, sxy = (prefix(a) for a in (valid.astype(np.float64), x, y, x * x, x * y))
+
+        # Returns row r covers dates r -> r + 1; use those ending strictly before as_of
+        end = np.searchsorted(prices.dates, as_of_dates, "left") - 1
+        end = np.clip(end, 0, len(stock))
+        start = np.maximum(end - window, 0)
+
+        def window_sum(p):
+            return p[end, cols] - p[start, cols]
+
+        count = window_sum(n)
+        var = count * window_sum(sxx) - window_sum(sx) ** 2
+        cov = count * window_sum(sxy) - window_sum(sx) * window_sum(sy)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            beta = cov / var
+        return np.where((count >= MIN_BETA_OBSERVATIONS) & (var > 0), beta, 1.0)
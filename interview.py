@@ -1,121 +1,75 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
-from datetime import datetime, timedelta
+from price_store import PriceStore
+from events import load_events
 import matplotlib.pyplot as plt
-import requests
+import rates
+from costs import TRANSACTION_COST, LONG_SPREAD, allocate_positions, calculate_transaction_costs, overnight_costs
+from portfolio import run_portfolio
+from backtest_engine import simulate
+from result_cache import ResultCache, export_csv, write_results
+from trades import TradeBuffer
 
 # === Parameters ===
 PORTFOLIO_SIZE = 5000000  # $5 million
-TRANSACTION_COST = 0.01  # $0.01 per share
 START_DATE = '2022-05-01'
 END_DATE = '2024-11-01'
+SEED = 42  # Fixes the holding-period draws so reruns are reproducible
+SIMULATION_PATHS = 10000
 fed_api = "cc29e12bf7365d61df7f30a335e24ca1"
+price_store = PriceStore()
+result_cache = ResultCache('interview')
+COST_PARAMS = {'transaction_cost': TRANSACTION_COST, 'long_spread': LONG_SPREAD}  # What the cost functions use
+RESULTS_FILE = 'results.parquet'
+EXPORT_CSV = False  # Also write results_sorted.csv
 
 # === Data Download ===
 def download_data(events, start_date=START_DATE, end_date=END_DATE):
+    """Load prices from the local store, fetching only dates it does not have yet."""
     tickers = events['Ticker'].unique().tolist()
-    prices = yf.download(tickers, start=start_date, end=end_date, group_by='ticker')
-    spy = yf.download('SPY', start=start_date, end=end_date)
+    price_store.ensure(tickers + ['SPY'], start_date, end_date)
+    prices = price_store.panel(tickers, start_date, end_date)
+    spy = price_store.frame('SPY', start_date, end_date)
     return prices, spy
 
 # === Filter by Index Function ===
 def filter_by_index(events, index_name):
     """Filter events based on the specified index or include all indexes if 'All' is selected."""
-    if index_name == 'All':
-        return events  # Return all events without filtering
-    return events[events['Index Change'] == index_name]
-
-# === Transaction Costs Calculation ===
-def calculate_transaction_costs(shares):
-    return shares * TRANSACTION_COST
-
-# === Overnight Costs Calculation ===
-def overnight_costs(position, fed_rate, holding_period, is_long=True):
-    rate = (fed_rate/100) + (0.015 if is_long else 0.01)
-    return (position * rate * holding_period) / 365
+    return events.select(index=index_name)
 
 # === Fetch Fed Funds Rate ===
 def get_fed_funds_rate(date):
-    # Define FRED API endpoint and parameters
-    endpoint = f'https://markets.newyorkfed.org/api/rates/unsecured/effr/search.json?startDate={START_DATE}&endDate={END_DATE}&type=rate'
-    response = requests.get(endpoint)
-    
-    # Check if the request was successful
-    if response.status_code == 200:
-        data = response.json()
-        for x in data["refRates"]:
-            if str(x["effectiveDate"]) == str(date).split(" ")[0]:
-                return float(x["percentRate"])+1.25
-    else:
-        print("Error fetching data:", response.status_code)
-        return None
-
-
-
-# === Portfolio Allocation Based on Liquidity Constraints ===
-def allocate_positions(prices, events):
-    allocations = {}
-    for ticker in events['Ticker'].unique():
-        avg_volume = prices[ticker]['Volume'].rolling(20).mean().iloc[-1]
-        max_position = avg_volume * 0.01
-        allocations[ticker] = min(max_position, PORTFOLIO_SIZE / len(events))
-    return allocations
+    return rates.get_curve(START_DATE, END_DATE).rate(date) + 1.25
+
+def get_fed_funds_rates(dates):
+    """Vectorized get_fed_funds_rate for an array of dates."""
+    return rates.get_curve(START_DATE, END_DATE).lookup(dates) + 1.25
 
 # === Backtest Trading Strategies (Supports Opening and Closing Prices Only) ===
-def backtest(events, prices, spy):
-    results = []
-    fed_rate = 0
-    for _, event in events.iterrows():
-        ticker = event['Ticker']
-        trade_date = pd.to_datetime(event["Trade Date"])
-        fed_rate = get_fed_funds_rate(str(trade_date))
-        # Determine random holding period for each trade between trade_date and end of price data
-        max_possible_holding_period = (prices[ticker].index[-1] - trade_date).days
-        if max_possible_holding_period < 1:
-            continue  # Skip if there's no data beyond the trade date
-        
-        holding_period = np.random.randint(1, max_possible_holding_period + 1)
-        exit_date = trade_date + timedelta(days=holding_period)
-
-        try:
-            entry_price = prices[ticker].loc[trade_date]['Open']
-            exit_price = prices[ticker].loc[exit_date]['Close']
-        except KeyError:
-            print(f"Missing data for {ticker} on {trade_date} or {exit_date}. Skipping...")
-            continue
-
-        if pd.isna(entry_price) or pd.isna(exit_price):
-            continue
-
-        shares = PORTFOLIO_SIZE // entry_price
-        pnl = (exit_price - entry_price) * shares
-
-        txn_costs = calculate_transaction_costs(shares)
-        overnight_cost = overnight_costs(shares * entry_price, fed_rate, holding_period)
-
-        net_pnl = pnl - txn_costs - overnight_cost
-
-        if net_pnl != 0:
-            results.append({
-                'Ticker': ticker,
-                'Entry Date': trade_date,
-                'Exit Date': exit_date,
-                'Holding Period (Days)': holding_period,
-                'Entry Price': entry_price,
-                'Exit Price': exit_price,
-                'PnL': net_pnl,
-                'Transaction Costs': txn_costs
-            })
-
-    return pd.DataFrame(results)
+def backtest(events, prices, spy, allocations=None):
+    fed_rates = get_fed_funds_rates(pd.to_datetime(events["Trade Date"]))
+    return result_cache.run(events, prices, price_store, fed_rates, PORTFOLIO_SIZE,
+                            calculate_transaction_costs, overnight_costs, COST_PARAMS, SEED,
+                            max_shares=allocations,
+                            out=TradeBuffer(capacity=len(events)))
+
+# === Monte Carlo Simulation of Holding Periods ===
+def simulate_holding_periods(events, prices, spy, allocations=None, n_paths=SIMULATION_PATHS, seed=SEED):
+    """Net PnL distributions per event and per index over n_paths holding-period draws."""
+    fed_rates = get_fed_funds_rates(pd.to_datetime(events["Trade Date"]))
+    return simulate(events, prices, fed_rates, PORTFOLIO_SIZE, calculate_transaction_costs,
+                    overnight_costs, n_paths=n_paths, seed=seed, max_shares=allocations)
+
+# === Daily Portfolio Accounting ===
+def daily_portfolio(results, prices, spy=None):
+    """Mark every position to market daily under the shared PORTFOLIO_SIZE capital."""
+    fed_rates = get_fed_funds_rates(prices.index)
+    return run_portfolio(results, prices, PORTFOLIO_SIZE, fed_rates, TRANSACTION_COST, spy=spy)
 
 # === Plotting the Results ===
-def plot_results(results):
-    daily_pnl = results.groupby("Entry Date")["PnL"].sum()
-
+def plot_results(portfolio):
     # Generate Equity Curve (Cumulative PnL)
-    equity_curve = daily_pnl.cumsum()
+    equity_curve = portfolio["Equity"] - PORTFOLIO_SIZE
 
     # 4. Visualization - Equity Curve
     plt.figure(figsize=(12, 6))
@@ -129,11 +83,12 @@ def plot_results(results):
 
 # === Generate PnL Summary ===
 def pnl_summary(results):
-    total_profit = results[results['PnL'] > 0]['PnL'].sum()
-    total_loss = results[results['PnL'] < 0]['PnL'].sum()
-    net_pnl = results['PnL'].sum()
-    num_winning_trades = (results['PnL'] > 0).sum()
-    num_losing_trades = (results['PnL'] < 0).sum()
+    pnl = results['Net PnL']
+    total_profit = pnl[pnl > 0].sum()
+    total_loss = pnl[pnl < 0].sum()
+    net_pnl = pnl.sum()
+    num_winning_trades = (pnl > 0).sum()
+    num_losing_trades = (pnl < 0).sum()
 
     summary = {
         'Total Profit': total_profit,
@@ -145,13 +100,13 @@ def pnl_summary(results):
     return summary
 
 # === Sort Results by Profit/Loss ===
-def sort_results(results, by='PnL', ascending=False):
-    return results.sort_values(by=by, ascending=ascending)
+def sort_results(trades, by='Net PnL', ascending=False):
+    return trades.sorted(by=by, ascending=ascending)
 
 # === Main Execution ===
 if __name__ == "__main__":
     # Load events data
-    events = pd.read_csv('indexInfo.csv')
+    events = load_events()
 
     # === Filter by Index ===
     index_name = input("Enter the index name ('S&P 400', 'S&P 500', 'S&P 600', or 'All'): ")
@@ -161,28 +116,38 @@ if __name__ == "__main__":
     prices, spy = download_data(events)
 
     # Allocate positions
-    allocations = allocate_positions(prices, events)
+    allocations = allocate_positions(prices, events, PORTFOLIO_SIZE)
 
-    # Run the backtest (trading only at opening and closing prices)
-    results = backtest(events, prices, spy)
+    # Run the backtest (trading only at opening and closing prices) into a trade buffer
+    trades = backtest(events, prices, spy, allocations)
 
     # Filter out invalid or zero PnL results
-    results = results[results['PnL'].notna() & (results['PnL'] != 0)]
+    pnl = trades['Net PnL']
+    trades = trades.select(~np.isnan(pnl) & (pnl != 0))
 
     # Sort results by PnL
-    results_sorted = sort_results(results, by='PnL', ascending=False)
+    trades_sorted = sort_results(trades, by='Net PnL', ascending=False)
 
-    # Save sorted results to CSV
-    results_sorted.to_csv('results_sorted.csv', index=False)
+    # Save sorted results; the CSV copy is optional
+    write_results(trades_sorted, RESULTS_FILE)
+    if EXPORT_CSV:
+        export_csv(trades_sorted.to_frame(), 'results_sorted.csv')
     print("\nSorted Results:")
-    print(results_sorted)
+    print(trades_sorted.head())
 
     # Generate and print PnL summary
-    summary = pnl_summary(results_sorted)
+    summary = pnl_summary(trades)
     print("\nPnL Summary:")
     for key, value in summary.items():
         print(f"{key}: {value}")
 
     # Plot results if valid trades exist
-    if not results.empty:
-        plot_results(results)
+    if len(trades):
+        plot_results(daily_portfolio(trades, prices))
+
+    # Distribution of outcomes over many seeded holding-period draws
+    if SIMULATION_PATHS > 0:
+        per_event, per_index = simulate_holding_periods(events, prices, spy, allocations)
+        per_event.to_csv('simulation_by_event.csv', index=False)
+        print("\nSimulated Net PnL by Index:")
+        print(per_index)
@@ -1,107 +1,283 @@
-import requests
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import pytz
-from dotenv import dotenv_values
+import sys
+import threading
 import time
-config = dotenv_values(".env")
-API_KEY = config["alpaca-key"]
-SECRET_KEY = config["secret-key"]
-BASE_URL = "https://paper-api.alpaca.markets"
-DATA_URL = "https://data.alpaca.markets"
-
-HEADERS = {
-    "APCA-API-KEY-ID": API_KEY,
-    "APCA-API-SECRET-KEY": SECRET_KEY
-}
-
-# Fetch tickers using Alpaca's API
+from collections import deque
+from market_data import fetch_minute_bars, tradable_assets
+from price_store import PriceStore
+from stream import QuoteStream
+
+# Fetch tickers from the daily-cached Alpaca asset list
 def fetch_tickers(limit=20):
     try:
-        response = requests.get(f"{BASE_URL}/v2/assets", headers=HEADERS)
-        response.raise_for_status()
-        assets = response.json()
-        tickers = [asset['symbol'] for asset in assets if asset['tradable']][:limit]
-        return tickers
+        return tradable_assets()[:limit]
     except Exception as e:
         print(f"Error fetching tickers: {e}")
         return []
 
-# Fetch historical bars for a ticker
+EASTERN = pytz.timezone('US/Eastern')
+MARKET_OPEN = pd.Timestamp('09:30').time()
+MARKET_CLOSE = pd.Timestamp('16:00').time()
+
+UNIVERSE_SIZE = 2000  # Tickers scored per run
+TOP_K = 20  # Best master slopes reported
+SCORE_CHUNK = 200  # Tickers loaded into memory at once while scoring
+
+STORE_COLUMNS = {'o': 'Open', 'h': 'High', 'l': 'Low', 'c': 'Close', 'v': 'Volume'}
+
+minute_store = PriceStore(interval="1Min", fetcher=fetch_minute_bars)
+
+# Fetch historical bars for a ticker, served from the minute store
 def fetch_historical_data(symbol, days=30):
-    end = datetime.now().isoformat()
+    end = pd.Timestamp.now(tz="UTC")
+    start = end - pd.Timedelta(days=days)
     try:
-        response = requests.get(
-            f"{DATA_URL}/v1/stocks/{symbol}/bars",
-            params={
-                "start": (datetime.now() - timedelta(days=days)).isoformat(),
-                "end": end,
-                "timeframe": "1Min",
-            },
-            headers=HEADERS
-        )
-        response.raise_for_status()
-        data = response.json()['bars']
-        df = pd.DataFrame(data)
-        df['t'] = pd.to_datetime(df['t'], utc=True)
-        df.set_index('t', inplace=True)
-        return df
+        minute_store.ensure([symbol], start, end)
+        df = minute_store.frame(symbol, start, end)
+        return df.rename(columns={v: k for k, v in STORE_COLUMNS.items()})
     except Exception as e:
         print(f"Error fetching data for {symbol}: {e}")
         return pd.DataFrame()
 
-# Calculate the master linear regression
+# Calculate the master linear regression for one ticker
 def get_master_linear_regression(symbol):
-    eastern = pytz.timezone('US/Eastern')
-    now_eastern = datetime.now(eastern)
-    start_time = now_eastern.replace(hour=9, minute=30, second=0, microsecond=0)
+    start_time = datetime.now(EASTERN).replace(hour=9, minute=30, second=0, microsecond=0)
 
-    # Get historical data
     df = fetch_historical_data(symbol)
     if df.empty:
         print(f"No data available for {symbol}")
         return None
 
     # Filter for market hours
-    df = df.between_time('09:30', '16:00')
-
-    # Prepare lists for linear regression
-    times_numeric = [(t - start_time).total_seconds() / 60 for t in df.index]
-    prices = df['c'].tolist()
-    volumes = df['v'].tolist()
-
-    if len(times_numeric) < 2:
+    df = df.tz_convert(EASTERN).between_time('09:30', '16:00')
+    if len(df) < 2:
         print(f"Not enough data points for {symbol}")
         return None
 
-    # Perform linear regression
-    price_slope, _ = np.polyfit(times_numeric, prices, 1)
-    volume_slope, _ = np.polyfit(times_numeric, volumes, 1)
-    master_slope = price_slope * volume_slope
-
+    minutes = (df.index - start_time).total_seconds().to_numpy() / 60
+    price_slope, volume_slope = batch_slopes(
+        minutes, df['c'].to_numpy(float)[None, :], df['v'].to_numpy(float)[None, :]
+    )
     return {
         'symbol': symbol,
-        'price_slope': price_slope,
-        'volume_slope': volume_slope,
-        'master_slope': master_slope
+        'price_slope': price_slope[0],
+        'volume_slope': volume_slope[0],
+        'master_slope': price_slope[0] * volume_slope[0],
     }
 
-def main():
-    tickers = fetch_tickers(limit=20)
-    print(f"Fetched tickers: {tickers}")
+# Closed-form slopes for a whole universe at once
+def batch_slopes(x, prices, volumes):
+    """OLS slopes of every row of symbols x minutes price and volume matrices.
+
+    x holds the minute of each column. NaN marks a missing bar; each symbol is
+    fitted on the minutes where it has both price and volume. Rows with fewer
+    than two bars get NaN slopes.
+    """
+    valid = ~np.isnan(prices) & ~np.isnan(volumes)
+    n = valid.sum(axis=1)
+    x = np.where(valid, np.broadcast_to(x, prices.shape), 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Centre x per row before summing squares to keep the fit well conditioned
+        xc = np.where(valid, x - (x.sum(axis=1) / n)[:, None], 0.0)
+        sxx = (xc * xc).sum(axis=1)
+
+        def slope(y):
+            return np.where((n >= 2) & (sxx > 0), (xc * np.where(valid, y, 0.0)).sum(axis=1) / sxx, np.nan)
+
+        return slope(prices), slope(volumes)
+
+
+def top_k(symbols, price_slope, volume_slope, k=20):
+    """The k highest master_slope results, via argpartition rather than a full sort."""
+    master = price_slope * volume_slope
+    ranked = np.where(np.isnan(master), -np.inf, master)
+    k = min(k, int(np.isfinite(ranked).sum()))
+    if k == 0:
+        return []
+    best = np.argpartition(-ranked, k - 1)[:k]
+    best = best[np.argsort(-ranked[best])]
+    return [
+        {
+            'symbol': symbols[i],
+            'price_slope': price_slope[i],
+            'volume_slope': volume_slope[i],
+            'master_slope': master[i],
+        }
+        for i in best
+    ]
+
+
+def score_universe(tickers, days=30, k=20, chunk=SCORE_CHUNK):
+    """Top-k master slopes over the market-hours minute bars of every ticker.
+
+    Only Close and Volume are loaded, chunk tickers at a time, and each chunk's
+    top k is merged into the running top k, so memory stays bounded by the
+    chunk rather than the universe.
+    """
+    end = pd.Timestamp.now(tz="UTC")
+    start = end - pd.Timedelta(days=days)
+    minute_store.ensure(tickers, start, end)
+    best = []
+    for i in range(0, len(tickers), chunk):
+        panel = minute_store.panel(tickers[i:i + chunk], start, end, fields=('Close', 'Volume'))
+        if not len(panel.dates):
+            continue
+        times = panel.index.tz_localize("UTC").tz_convert(EASTERN)
+        rows = times.indexer_between_time('09:30', '16:00')
+        minutes = (panel.dates[rows] - panel.dates[0]) / np.timedelta64(1, "m")
+        price_slope, volume_slope = batch_slopes(
+            minutes, panel.fields['Close'][rows].T, panel.fields['Volume'][rows].T
+        )
+        best += top_k(panel.tickers, price_slope, volume_slope, k)
+        best = sorted(best, key=lambda r: r['master_slope'], reverse=True)[:k]
+    return best
+
+
+# Running least-squares slopes, updated bar by bar
+class OnlineRegression:
+    """Price and volume slopes against minutes since anchor, kept as running sums.
 
-    results = []
+    Each bar adds to n, sum(x), sum(x^2), sum(y) and sum(x*y) for both series,
+    so an update and a slope read are O(1). With window set (in minutes), bars
+    that fall out of the window are subtracted back out as new ones arrive.
+    """
+
+    def __init__(self, anchor, window=None):
+        self.anchor = anchor
+        self.window = window
+        self.bars = deque()
+        self.n = 0
+        self.sx = self.sxx = 0.0
+        self.sp = self.sxp = 0.0
+        self.sv = self.sxv = 0.0
+
+    def _add(self, x, price, volume, sign):
+        self.n += sign
+        self.sx += sign * x
+        self.sxx += sign * x * x
+        self.sp += sign * price
+        self.sxp += sign * x * price
+        self.sv += sign * volume
+        self.sxv += sign * x * volume
+
+    def update(self, t, price, volume):
+        x = (t - self.anchor).total_seconds() / 60
+        self._add(x, price, volume, 1)
+        if self.window is not None:
+            self.bars.append((x, price, volume))
+            while self.bars[0][0] <= x - self.window:
+                self._add(*self.bars.popleft(), -1)
+
+    def _slope(self, sy, sxy):
+        denom = self.n * self.sxx - self.sx ** 2
+        if self.n < 2 or denom <= 0:
+            return np.nan
+        return (self.n * sxy - self.sx * sy) / denom
+
+    @property
+    def price_slope(self):
+        return self._slope(self.sp, self.sxp)
+
+    @property
+    def volume_slope(self):
+        return self._slope(self.sv, self.sxv)
+
+    @property
+    def master_slope(self):
+        return self.price_slope * self.volume_slope
+
+
+class StreamingRegressions:
+    """One OnlineRegression per symbol over its current session's market-hours bars.
+
+    A symbol restarts when its first bar of a new session arrives, so
+    rescoring the universe each minute never refits history. Symbols with no
+    bars in the latest session seen are left out of scores(). update() may run
+    on the stream's thread while scores() runs on another, so both hold a lock.
+    """
+
+    def __init__(self, window=None):
+        self.window = window
+        self.session_open = None
+        self.regressions = {}
+        self._lock = threading.Lock()
+
+    def update(self, symbol, t, price, volume):
+        t = pd.Timestamp(t).tz_convert(EASTERN)
+        if not MARKET_OPEN <= t.time() < MARKET_CLOSE:
+            return
+        session_open = t.replace(hour=9, minute=30, second=0, microsecond=0, nanosecond=0)
+        with self._lock:
+            if self.session_open is None or session_open > self.session_open:
+                self.session_open = session_open
+            reg = self.regressions.get(symbol)
+            if reg is not None and session_open < reg.anchor:
+                return  # A late bar from a session this symbol has already left
+            if reg is None or session_open > reg.anchor:
+                reg = self.regressions[symbol] = OnlineRegression(session_open, self.window)
+            reg.update(t, price, volume)
+
+    def update_bar(self, bar):
+        """Apply one minute-bar message from the data stream ({"S", "t", "c", "v", ...})."""
+        self.update(bar["S"], pd.Timestamp(bar["t"]), bar["c"], bar["v"])
+
+    def seed(self, symbol, df):
+        """Replay stored minute bars (columns 'c' and 'v', UTC index) into symbol's regression."""
+        for t, price, volume in zip(df.index, df['c'].to_numpy(), df['v'].to_numpy()):
+            self.update(symbol, t, price, volume)
+
+    def scores(self):
+        """Current slopes for every symbol with at least two bars, best master_slope first."""
+        with self._lock:
+            results = [
+                {
+                    'symbol': symbol,
+                    'price_slope': reg.price_slope,
+                    'volume_slope': reg.volume_slope,
+                    'master_slope': reg.master_slope,
+                }
+                for symbol, reg in self.regressions.items()
+                if reg.anchor == self.session_open and reg.n >= 2
+            ]
+        return sorted(results, key=lambda r: r['master_slope'], reverse=True)
+
+
+def stream_main(limit=20, window=None, interval=60):
+    """Seed today's bars from the store, then rescore the universe from live minute bars."""
+    tickers = fetch_tickers(limit=limit)
+    regressions = StreamingRegressions(window)
+    end = pd.Timestamp.now(tz="UTC")
+    start = end - pd.Timedelta(days=1)
+    minute_store.ensure(tickers, start, end)
     for ticker in tickers:
-        print(f"Processing {ticker}...")
-        result = get_master_linear_regression(ticker)
-        if result:
-            results.append(result)
+        df = minute_store.frame(ticker, start, end)
+        regressions.seed(ticker, df.rename(columns={v: k for k, v in STORE_COLUMNS.items()}))
+    QuoteStream(tickers, on_bar=regressions.update_bar, quotes=False).start()
+
+    while True:
+        print(f"\nMaster Linear Regressions ({datetime.now(EASTERN):%H:%M}):")
+        for res in regressions.scores():
+            print(f"{res['symbol']}: Master Slope={res['master_slope']:.4f}, "
+                  f"Price Slope={res['price_slope']:.4f}, Volume Slope={res['volume_slope']:.4f}")
+        time.sleep(interval)
+
+def main():
+    tickers = fetch_tickers(limit=UNIVERSE_SIZE)
+    print(f"Fetched {len(tickers)} tickers")
+
+    results = score_universe(tickers, k=TOP_K)
 
-    print("\nMaster Linear Regressions:")
+    print(f"\nTop {TOP_K} Master Linear Regressions:")
     for res in results:
         print(f"{res['symbol']}: Master Slope={res['master_slope']:.4f}, "
               f"Price Slope={res['price_slope']:.4f}, Volume Slope={res['volume_slope']:.4f}")
 
 if __name__ == "__main__":
-    main()
+    # python linear_reg.py --stream rescores from live bars instead of refitting history
+    if "--stream" in sys.argv:
+        stream_main()
+    else:
+        main()
@@ -1,14 +1,6 @@
-from dotenv import dotenv_values
-
-config = dotenv_values(".env")
+from orders import gateway
 
 def liquidate():
-    import requests
-
-    url = "https://paper-api.alpaca.markets/v2/positions?cancel_orders=true"
-
-    headers = {"accept": "application/json", "APCA-API-KEY-ID": config["alpaca-key"], "APCA-API-SECRET-KEY": config["secret-key"]}
-
-    response = requests.delete(url, headers=headers)
+    response = gateway.request("DELETE", "/v2/positions", params={"cancel_orders": "true"})
 
-    print(response.text)
\ No newline at end of file
+    print(response.text)
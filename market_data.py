@@ -0,0 +1,107 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+
+import client
+from orders import TokenBucket
+from price_store import FIELDS
+
+BARS_URL = f"{client.DATA_URL}/v2/stocks/bars"
+ASSETS_URL = f"{client.BASE_URL}/v2/assets"
+FEED = client.config.get("data-feed", "iex")
+CACHE_DIR = "cache"
+
+DATA_RATE_LIMIT = 200 / 60  # Requests per second allowed by the data API
+DATA_BURST = 10
+SYMBOLS_PER_REQUEST = 100
+PAGE_LIMIT = 10000  # Bars per page, across all symbols in the request
+FETCH_WORKERS = 8
+MAX_RETRIES = 4
+BACKOFF = 0.5  # Seconds, doubled per retry
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Every bar request, from any thread, draws from one bucket
+bucket = TokenBucket(DATA_RATE_LIMIT, DATA_BURST)
+
+
+def _get(url, params, endpoint):
+    delay = BACKOFF
+    for attempt in range(MAX_RETRIES + 1):
+        bucket.acquire()
+        try:
+            response = client.get(url, endpoint=endpoint, params=params)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                response.raise_for_status()
+                return response.json()
+        time.sleep(delay)
+        delay *= 2
+
+
+def _decode(bars):
+    """One symbol's bar dicts as (datetime64[ns] dates, rows x FIELDS float64 values)."""
+    dates = np.array([b["t"].rstrip("Z") for b in bars], dtype="datetime64[ns]")
+    values = np.array([(b["o"], b["h"], b["l"], b["c"], b["v"]) for b in bars], dtype=np.float64)
+    return dates, values.reshape(-1, len(FIELDS))
+
+
+def fetch_bars(symbols, start, end, timeframe="1Min"):
+    """{symbol: (dates, values)} for one multi-symbol request, following every page token."""
+    params = {
+        "symbols": ",".join(symbols),
+        "timeframe": timeframe,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "limit": PAGE_LIMIT,
+        "feed": FEED,
+    }
+    chunks = {}
+    while True:
+        page = _get(BARS_URL, params, "bars")
+        for symbol, bars in (page.get("bars") or {}).items():
+            if bars:
+                chunks.setdefault(symbol, []).append(_decode(bars))
+        token = page.get("next_page_token")
+        if not token:
+            break
+        params["page_token"] = token
+    return {
+        symbol: (np.concatenate([d for d, _ in parts]), np.concatenate([v for _, v in parts]))
+        for symbol, parts in chunks.items()
+    }
+
+
+def fetch_minute_bars(tickers, start, end, timeframe="1Min", workers=FETCH_WORKERS):
+    """PriceStore fetcher: OHLCV frames per ticker, fetched in concurrent symbol batches."""
+    batches = [tickers[i:i + SYMBOLS_PER_REQUEST] for i in range(0, len(tickers), SYMBOLS_PER_REQUEST)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda batch: fetch_bars(batch, start, end, timeframe), batches)
+        frames = {}
+        for bars in results:
+            for symbol, (dates, values) in bars.items():
+                index = pd.DatetimeIndex(dates).tz_localize("UTC")
+                frames[symbol] = pd.DataFrame(values, index=index, columns=FIELDS, copy=False)
+    return frames
+
+
+def tradable_assets(cache_dir=CACHE_DIR):
+    """Symbols of all tradable assets, downloaded at most once per day."""
+    path = os.path.join(cache_dir, f"assets_{pd.Timestamp.now(tz='UTC'):%Y-%m-%d}.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    response = client.get(ASSETS_URL, endpoint="assets", params={"status": "active"})
+    response.raise_for_status()
+    symbols = [asset["symbol"] for asset in response.json() if asset["tradable"]]
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(symbols, f)
+    return symbols
@@ -1,15 +1,61 @@
-from dotenv import dotenv_values
+import threading
+import time
+from datetime import datetime, timezone
 
-config = dotenv_values(".env")
+import client
 
-def marketOpen():
-    import requests
+BOUNDARY_SLACK = 1.0  # Seconds past an open/close before asking the broker again
+MIN_REFRESH_INTERVAL = 5.0  # Never hit /v2/clock more often than this
+
+
+class MarketClock:
+    """Caches /v2/clock; the answer only changes at next_open or next_close."""
+
+    def __init__(self):
+        self.is_open = False
+        self.next_open = None
+        self.next_close = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        response = client.get(f"{client.BASE_URL}/v2/clock", endpoint="clock")
+        data = response.json()
+        self.is_open = data["is_open"]
+        self.next_open = datetime.fromisoformat(data["next_open"])
+        self.next_close = datetime.fromisoformat(data["next_close"])
+        self._fetched_at = time.monotonic()
+
+    def next_change(self):
+        """The next open/close boundary as an aware datetime."""
+        return self.next_close if self.is_open else self.next_open
 
-    url = "https://paper-api.alpaca.markets/v2/clock"
+    def seconds_until_change(self):
+        self._ensure_fresh()
+        now = datetime.now(timezone.utc)
+        return max(0.0, (self.next_change() - now).total_seconds() + BOUNDARY_SLACK)
 
-    headers = {"accept": "application/json", "APCA-API-KEY-ID": config["alpaca-key"], "APCA-API-SECRET-KEY": config["secret-key"]}
+    def _ensure_fresh(self):
+        with self._lock:
+            if self.next_open is not None:
+                boundary_passed = datetime.now(timezone.utc) >= self.next_change()
+                too_soon = time.monotonic() - self._fetched_at < MIN_REFRESH_INTERVAL
+                if not boundary_passed or too_soon:
+                    return
+            self.refresh()
+
+    def open_now(self):
+        self._ensure_fresh()
+        return self.is_open
+
+
+clock = MarketClock()
+
+
+def marketOpen():
+    return clock.open_now()
 
-    response = requests.get(url, headers=headers)
 
-    print(response.text)
-    return response.json()["is_open"]
\ No newline at end of file
+def sleep_until_change():
+    """Sleep until the market next opens or closes."""
+    time.sleep(max(clock.seconds_until_change(), MIN_REFRESH_INTERVAL))
@@ -1,135 +1,84 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
-from datetime import datetime, timedelta
+from price_store import PriceStore
+from events import load_events
 import matplotlib.pyplot as plt
-import requests
+import rates
+from costs import TRANSACTION_COST, LONG_SPREAD, allocate_positions, calculate_transaction_costs, overnight_costs
+from portfolio import run_portfolio
+from backtest_engine import simulate
+from result_cache import ResultCache, export_csv, write_results
+from trades import TradeBuffer
+from hedge import SpyHedge
 
 # === Parameters ===
 PORTFOLIO_SIZE = 5000000  # $5 million
-TRANSACTION_COST = 0.01  # $0.01 per share
 START_DATE = '2022-05-01'
 END_DATE = '2024-11-01'
+SEED = 42  # Fixes the holding-period draws so reruns are reproducible
+SIMULATION_PATHS = 10000
+HEDGE_RATIO = 1.0  # SPY notional per $1 of position, or 'beta' for beta-weighted hedges
 FED_API = "cc29e12bf7365d61df7f30a335e24ca1"
+price_store = PriceStore()
+result_cache = ResultCache('new_interview')
+COST_PARAMS = {'transaction_cost': TRANSACTION_COST, 'long_spread': LONG_SPREAD}  # What the cost functions use
+RESULTS_FILE = 'results.parquet'
+EXPORT_CSV = False  # Also write results_sorted.csv
 
 # === Data Download ===
 def download_data(events, start_date=START_DATE, end_date=END_DATE):
+    """Load prices from the local store, fetching only dates it does not have yet."""
     tickers = events['Ticker'].unique().tolist()
-    prices = yf.download(tickers, start=start_date, end=end_date, group_by='ticker')
-    spy = yf.download('SPY', start=start_date, end=end_date)
+    price_store.ensure(tickers + ['SPY'], start_date, end_date)
+    prices = price_store.panel(tickers, start_date, end_date)
+    spy = price_store.frame('SPY', start_date, end_date)
     return prices, spy
 
 # === Filter by Index Function ===
 def filter_by_index(events, index_name):
-    if index_name == 'All':
-        return events
-    return events[events['Index Change'] == index_name]
-
-# === Transaction Costs Calculation ===
-def calculate_transaction_costs(shares):
-    return shares * TRANSACTION_COST
-
-# === Overnight Costs Calculation ===
-def overnight_costs(position, fed_rate, holding_period, is_long=True):
-    rate = (fed_rate / 100) + (0.015 if is_long else 0.01)
-    return (position * rate * holding_period) / 365
+    return events.select(index=index_name)
 
 # === Fetch Fed Funds Rate ===
 def get_fed_funds_rate(date):
-    endpoint = f'https://markets.newyorkfed.org/api/rates/unsecured/effr/search.json?startDate={START_DATE}&endDate={END_DATE}&type=rate'
-    response = requests.get(endpoint)
-
-    if response.status_code == 200:
-        data = response.json()
-        for x in data["refRates"]:
-            if str(x["effectiveDate"]) == str(date).split(" ")[0]:
-                return float(x["percentRate"]) + 1.25
-    else:
-        print("Error fetching data:", response.status_code)
-        return None
-
-# === Portfolio Allocation Based on Liquidity Constraints ===
-def allocate_positions(prices, events):
-    allocations = {}
-    for ticker in events['Ticker'].unique():
-        avg_volume = prices[ticker]['Volume'].rolling(20).mean().iloc[-1]
-        max_position = avg_volume * 0.01
-        allocations[ticker] = min(max_position, PORTFOLIO_SIZE / len(events))
-    return allocations
-
-# === SPY Hedge PnL Calculation ===
-def calculate_hedge_pnl(trade_date, exit_date, spy, portfolio_size):
-    spy_data = spy.loc[trade_date:exit_date]
-    if spy_data.empty or len(spy_data) < 2:
-        return 0.0
+    return rates.get_curve(START_DATE, END_DATE).rate(date) + 1.25
 
-    hedge_size = portfolio_size / spy_data.iloc[0]["Open"]
-    entry_price = spy_data.iloc[0]["Open"]
-    exit_price = spy_data.iloc[-1]["Close"]
+def get_fed_funds_rates(dates):
+    """Vectorized get_fed_funds_rate for an array of dates."""
+    return rates.get_curve(START_DATE, END_DATE).lookup(dates) + 1.25
 
-    hedge_pnl = hedge_size * (exit_price - entry_price)
-    return hedge_pnl
+# === SPY Hedge PnL Calculation ===
+def calculate_hedge_pnl(trade_date, exit_date, spy, portfolio_size, hedge_ratio=1.0):
+    """PnL of the SPY short hedging one trade; added to the trade's PnL."""
+    hedge = SpyHedge(spy)
+    dates = pd.to_datetime([trade_date, exit_date]).values
+    return float(hedge.pnl(dates[:1], dates[1:], portfolio_size, hedge_ratio)[0])
 
 # === Backtest Trading Strategies ===
-def backtest(events, prices, spy):
-    results = []
-    fed_rate = 0
-    for _, event in events.iterrows():
-        ticker = event['Ticker']
-        trade_date = pd.to_datetime(event["Trade Date"])
-        fed_rate = get_fed_funds_rate(str(trade_date))
-
-        max_possible_holding_period = (prices[ticker].index[-1] - trade_date).days
-        if max_possible_holding_period < 1:
-            continue
-
-        holding_period = np.random.randint(1, max_possible_holding_period + 1)
-        exit_date = trade_date + timedelta(days=holding_period)
-
-        try:
-            entry_price = prices[ticker].loc[trade_date]['Open']
-            exit_price = prices[ticker].loc[exit_date]['Close']
-        except KeyError:
-            print(f"Missing data for {ticker} on {trade_date} or {exit_date}. Skipping...")
-            continue
-
-        if pd.isna(entry_price) or pd.isna(exit_price):
-            continue
-
-        shares = PORTFOLIO_SIZE // entry_price
-        pnl = (exit_price - entry_price) * shares
-
-        txn_costs = calculate_transaction_costs(shares)
-        overnight_cost = overnight_costs(shares * entry_price, fed_rate, holding_period)
-
-        # Hedge PnL
-        hedge_pnl = calculate_hedge_pnl(trade_date, exit_date, spy, PORTFOLIO_SIZE)
-
-        # Net PnL (with hedge)
-        net_pnl = pnl - txn_costs - overnight_cost - hedge_pnl
-
-        if net_pnl != 0:
-            results.append({
-                'Ticker': ticker,
-                'Entry Date': trade_date,
-                'Exit Date': exit_date,
-                'Holding Period (Days)': holding_period,
-                'Entry Price': entry_price,
-                'Exit Price': exit_price,
-                'PnL': pnl,
-                'Hedge PnL': hedge_pnl,
-                'Net PnL': net_pnl,
-                'Transaction Costs': txn_costs
-            })
-
-    return pd.DataFrame(results)
+def backtest(events, prices, spy, allocations=None):
+    fed_rates = get_fed_funds_rates(pd.to_datetime(events["Trade Date"]))
+    return result_cache.run(events, prices, price_store, fed_rates, PORTFOLIO_SIZE,
+                            calculate_transaction_costs, overnight_costs, COST_PARAMS, SEED,
+                            spy=spy, hedge_ratio=HEDGE_RATIO, max_shares=allocations,
+                            out=TradeBuffer(capacity=len(events)))
+
+# === Monte Carlo Simulation of Holding Periods ===
+def simulate_holding_periods(events, prices, spy, allocations=None, n_paths=SIMULATION_PATHS, seed=SEED):
+    """Net PnL distributions per event and per index over n_paths holding-period draws."""
+    fed_rates = get_fed_funds_rates(pd.to_datetime(events["Trade Date"]))
+    return simulate(events, prices, fed_rates, PORTFOLIO_SIZE, calculate_transaction_costs,
+                    overnight_costs, spy=spy, n_paths=n_paths, seed=seed, hedge_ratio=HEDGE_RATIO,
+                    max_shares=allocations)
+
+# === Daily Portfolio Accounting ===
+def daily_portfolio(results, prices, spy=None):
+    """Mark every position to market daily under the shared PORTFOLIO_SIZE capital."""
+    fed_rates = get_fed_funds_rates(prices.index)
+    return run_portfolio(results, prices, PORTFOLIO_SIZE, fed_rates, TRANSACTION_COST, spy=spy)
 
 # === Plotting the Results ===
-def plot_results(results):
-    daily_pnl = results.groupby("Entry Date")["Net PnL"].sum()
-
+def plot_results(portfolio):
     # Generate Equity Curve
-    equity_curve = daily_pnl.cumsum()
+    equity_curve = portfolio["Equity"] - PORTFOLIO_SIZE
 
     plt.figure(figsize=(12, 6))
     plt.plot(equity_curve, label="Equity Curve (Momentum Strategy with Hedge)", color="blue")
@@ -142,11 +91,12 @@ def plot_results(results):
 
 # === Generate PnL Summary ===
 def pnl_summary(results):
-    total_profit = results[results['Net PnL'] > 0]['Net PnL'].sum()
-    total_loss = results[results['Net PnL'] < 0]['Net PnL'].sum()
-    net_pnl = results['Net PnL'].sum()
-    num_winning_trades = (results['Net PnL'] > 0).sum()
-    num_losing_trades = (results['Net PnL'] < 0).sum()
+    pnl = results['Net PnL']
+    total_profit = pnl[pnl > 0].sum()
+    total_loss = pnl[pnl < 0].sum()
+    net_pnl = pnl.sum()
+    num_winning_trades = (pnl > 0).sum()
+    num_losing_trades = (pnl < 0).sum()
 
     summary = {
         'Total Profit': total_profit,
@@ -158,14 +108,10 @@ def pnl_summary(results):
     return summary
 
 # === Plotting the Results (Comparison of Hedge vs No Hedge) ===
-def plot_results_comparison(results):
-    # Calculate daily PnL for both with and without hedge
-    daily_pnl_with_hedge = results.groupby("Entry Date")["Net PnL"].sum()
-    daily_pnl_without_hedge = results.groupby("Entry Date")["PnL"].sum()
-
-    # Generate Equity Curves
-    equity_curve_with_hedge = daily_pnl_with_hedge.cumsum()
-    equity_curve_without_hedge = daily_pnl_without_hedge.cumsum()
+def plot_results_comparison(hedged, unhedged):
+    # Generate Equity Curves from the daily portfolios with and without hedge
+    equity_curve_with_hedge = hedged["Equity"] - PORTFOLIO_SIZE
+    equity_curve_without_hedge = unhedged["Equity"] - PORTFOLIO_SIZE
 
     # Plot Equity Curves
     plt.figure(figsize=(12, 6))
@@ -182,7 +128,7 @@ def plot_results_comparison(results):
 # === Main Execution ===
 if __name__ == "__main__":
     # Load events data
-    events = pd.read_csv('indexInfo.csv')
+    events = load_events()
 
     # === Filter by Index ===
     index_name = input("Enter the index name ('S&P 400', 'S&P 500', 'S&P 600', or 'All'): ")
@@ -192,29 +138,38 @@ if __name__ == "__main__":
     prices, spy = download_data(events)
 
     # Allocate positions
-    allocations = allocate_positions(prices, events)
+    allocations = allocate_positions(prices, events, PORTFOLIO_SIZE)
 
-    # Run the backtest
-    results = backtest(events, prices, spy)
+    # Run the backtest into a trade buffer
+    trades = backtest(events, prices, spy, allocations)
 
     # Filter out invalid or zero PnL results
-    results = results[results['Net PnL'].notna() & (results['Net PnL'] != 0)]
+    pnl = trades['Net PnL']
+    trades = trades.select(~np.isnan(pnl) & (pnl != 0))
 
     # Sort results by Net PnL
-    results_sorted = results.sort_values(by='Net PnL', ascending=False)
+    trades_sorted = trades.sorted(by='Net PnL', ascending=False)
 
-    # Save sorted results to CSV
-    results_sorted.to_csv('results_sorted.csv', index=False)
+    # Save sorted results; the CSV copy is optional
+    write_results(trades_sorted, RESULTS_FILE)
+    if EXPORT_CSV:
+        export_csv(trades_sorted.to_frame(), 'results_sorted.csv')
     print("\nSorted Results:")
-    print(results_sorted)
+    print(trades_sorted.head())
 
     # Generate and print PnL summary
-    summary = pnl_summary(results_sorted)
+    summary = pnl_summary(trades)
     print("\nPnL Summary:")
     for key, value in summary.items():
         print(f"{key}: {value}")
 
     # Plot comparison of equity curves with and without hedge
-    if not results.empty:
-        plot_results_comparison(results)
-
+    if len(trades):
+        plot_results_comparison(daily_portfolio(trades, prices, spy), daily_portfolio(trades, prices))
+
+    # Distribution of outcomes over many seeded holding-period draws
+    if SIMULATION_PATHS > 0:
+        per_event, per_index = simulate_holding_periods(events, prices, spy, allocations)
+        per_event.to_csv('simulation_by_event.csv', index=False)
+        print("\nSimulated Net PnL by Index:")
+        print(per_index)
@@ -1,19 +1,18 @@
 import alpaca_trade_api as tradeapi
-import threading
-import time
-from concurrent.futures import ThreadPoolExecutor
-from dotenv import dotenv_values
-from account import get_cash
-from market_open import marketOpen
-from submit_order import send_order
+import asyncio
+import client
+from book import book
+from market_open import marketOpen, sleep_until_change
 from bars import get_bars
+import quotes
+from engine import ScalpEngine, ORDER_WORKERS
+from orders import MAX_IN_FLIGHT
 from liquidate import liquidate
 
 # Load API credentials
-config = dotenv_values(".env")
-API_KEY = config["alpaca-key"]
-API_SECRET = config["secret-key"]
-BASE_URL = 'https://paper-api.alpaca.markets'
+API_KEY = client.config["alpaca-key"]
+API_SECRET = client.config["secret-key"]
+BASE_URL = client.BASE_URL
 
 # Initialize Alpaca API
 api = tradeapi.REST(API_KEY, API_SECRET, BASE_URL, api_version='v2')
@@ -26,59 +25,40 @@ symbols = [
     "NUZE", "RM", "FNVT", "ASAP", "MICT", "LMFA", "GRNQ", "BITF", "SOS", "RIOT"
 ]
 
+# One pooled connection per concurrent REST caller: the engine's workers plus the order gateway's
+client.configure(pool_size=ORDER_WORKERS + MAX_IN_FLIGHT)
+
+# All symbols share one batched quote request per TTL
+quotes.cache.ttl = 1.0
+quotes.watch(symbols)
+
 profit_target = 0.001  # 0.1% profit
-exact_loss_cutoff = 0.0005  # 0.05% loss (exact trigger)
+exact_loss_cutoff = 0.0005  # 0.05% loss
 
-def calculate_order_qty(symbol, budget):
+def calculate_order_qty(symbol, budget, latest_price=None):
     """Calculate how many shares can be bought within the budget."""
-    latest_price = float(get_bars(symbol, "1Min", limit=1)["quote"]["bp"])
+    if latest_price is None:
+        latest_price = float(get_bars(symbol, "1Min", limit=1)["quote"]["bp"])
     qty = int(budget / latest_price)
     return max(qty, 1)  # Ensure at least one share
 
-def scalp_trade(symbol):
-    """Execute a scalp trade for a single stock symbol."""
-    try:
-        budget = float(get_cash()) / len(symbols)
-        qty = calculate_order_qty(symbol, budget)
-
-        if qty == 0:
-            print(f"Insufficient funds to trade {symbol}.")
-            return
-
-        current_price = float(get_bars(symbol, "1Min", limit=1)["quote"]["bp"])
-        send_order(symbol, qty, 'buy', 'market', 'gtc')
-        print(f"Bought {qty} shares of {symbol} at {current_price}")
-
-        while True:
-            new_price = float(get_bars(symbol, "1Min", limit=1)["quote"]["bp"])
-
-            # Check for profit target
-            if new_price >= current_price * (1 + profit_target):
-                send_order(symbol, qty, 'sell', 'market', 'gtc')
-                print(f"Sold {qty} shares of {symbol} at {new_price} for a profit")
-                break
-
-            # Check for exact 0.05% loss
-            elif new_price == current_price * (1 - exact_loss_cutoff):
-                send_order(symbol, qty, 'sell', 'market', 'gtc')
-                print(f"Sold {qty} shares of {symbol} at {new_price} to cut exact 0.05% loss")
-                break
-
-            time.sleep(2)  # Wait 2 seconds before checking the price again
-
-    except Exception as e:
-        print(f"Error trading {symbol}: {e}")
+def order_size(symbol, price):
+    """Split the current buying power evenly across symbols and size the order."""
+    budget = book.buying_power / len(symbols)
+    return calculate_order_qty(symbol, budget, price)
 
 def main():
     """Run the trading strategy."""
+    book.load()
+    engine = ScalpEngine(symbols, order_size, profit_target, exact_loss_cutoff, cooldown=0, book=book,
+                         size_in="qty", exit_mode="bracket")
     while True:
         if marketOpen():
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                executor.map(scalp_trade, symbols)
+            asyncio.run(engine.run())
         else:
             print("Market Closed. Liquidating positions...")
             liquidate()
-            time.sleep(60)
+            sleep_until_change()
 
 if __name__ == "__main__":
     main()
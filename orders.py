@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+import client
+
+RATE_LIMIT = 200 / 60  # Requests per second allowed by the broker
+BURST = 10
+MAX_IN_FLIGHT = 8  # Order requests outstanding at once; further submits queue
+MAX_RETRIES = 4
+BACKOFF = 0.25  # Seconds, doubled per retry
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+LATENCY_SAMPLES = 10000
+
+
+class TokenBucket:
+    """Thread-safe token bucket; one instance is shared by every request on a rate-limited path."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def retry_after(value, default):
+    """Seconds to wait from a Retry-After header, in delta-seconds or HTTP-date form."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class OrderGateway:
+    """Single path for all order traffic: rate limited, retried and timed.
+
+    Every order carries a client_order_id, so a retry after a timeout or 5xx can
+    never create a duplicate; if the broker already has the id, the existing
+    order is returned instead.
+    """
+
+    def __init__(self, rate=RATE_LIMIT, burst=BURST, max_in_flight=MAX_IN_FLIGHT):
+        self.bucket = TokenBucket(rate, burst)
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+
+    def request(self, method, path, **kwargs):
+        """Send a rate-limited request to the trading API, retrying 429/5xx with backoff."""
+        url = f"{client.BASE_URL}{path}"
+        delay = BACKOFF
+        for attempt in range(MAX_RETRIES + 1):
+            self.bucket.acquire()
+            try:
+                response = client.request(method, url, endpoint="orders", **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                print(f"Order request failed ({e}), retrying in {delay}s...")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    return response
+                delay = retry_after(response.headers.get("Retry-After"), delay)
+                print(f"Order request returned {response.status_code}, retrying in {delay}s...")
+            time.sleep(delay)
+            delay *= 2
+
+    def submit_sync(self, symbol, side, type="market", time_in_force="day", qty=None, notional=None, **extra):
+        """Submit an order and block until the broker acknowledges it."""
+        payload = {"symbol": symbol, "side": side, "type": type, "time_in_force": time_in_force, **extra}
+        if qty is not None:
+            payload["qty"] = str(qty)
+        if notional is not None:
+            payload["notional"] = str(notional)
+        payload.setdefault("client_order_id", uuid.uuid4().hex)
+
+        with self._slots:
+            start = time.perf_counter()
+            response = self.request("POST", "/v2/orders", json=payload)
+            if response.status_code == 422 and "client_order_id" in response.text:
+                # An earlier attempt reached the broker before timing out
+                response = self.request(
+                    "GET", "/v2/orders:by_client_order_id",
+                    params={"client_order_id": payload["client_order_id"]},
+                )
+            self.latencies.append(time.perf_counter() - start)
+
+        return response.json()
+
+    def get_order(self, order_id):
+        """The broker's current view of one order."""
+        response = self.request("GET", f"/v2/orders/{order_id}")
+        response.raise_for_status()
+        return response.json()
+
+    async def submit(self, symbol, side, **kwargs):
+        """Async form of submit_sync; the request runs on the gateway's bounded pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self.submit_sync(symbol, side, **kwargs))
+
+    def submit_bracket_sync(self, symbol, qty, entry_price, profit_target, loss_cutoff, time_in_force="day"):
+        """Market buy with take-profit and stop-loss legs held by the broker.
+
+        Leg prices are profit_target/loss_cutoff away from entry_price, and at
+        least one tick away so the broker accepts them.
+        """
+        take_profit, stop_loss = bracket_prices(entry_price, profit_target, loss_cutoff)
+        return self.submit_sync(
+            symbol, "buy", type="market", time_in_force=time_in_force, qty=qty,
+            order_class="bracket",
+            take_profit={"limit_price": str(take_profit)},
+            stop_loss={"stop_price": str(stop_loss)},
+        )
+
+    async def submit_bracket(self, symbol, qty, entry_price, profit_target, loss_cutoff, time_in_force="day"):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            lambda: self.submit_bracket_sync(symbol, qty, entry_price, profit_target, loss_cutoff, time_in_force),
+        )
+
+    def latency_summary(self):
+        """Submit-to-ack latency statistics in milliseconds."""
+        samples = sorted(self.latencies)
+        if not samples:
+            return {}
+        return {
+            "count": len(samples),
+            "p50": samples[len(samples) // 2] * 1000,
+            "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+            "max": samples[-1] * 1000,
+        }
+
+
+def bracket_prices(entry_price, profit_target, loss_cutoff):
+    """Take-profit limit and stop-loss stop prices rounded to valid ticks."""
+    decimals = 2 if entry_price >= 1 else 4
+    tick = 10 ** -decimals
+    take_profit = max(round(entry_price * (1 + profit_target), decimals), round(entry_price + tick, decimals))
+    stop_loss = min(round(entry_price * (1 - loss_cutoff), decimals), round(entry_price - tick, decimals))
+    return take_profit, stop_loss
+
+
+gateway = OrderGateway()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+LONG_SPREAD = 0.015  # Financing spread over fed funds for long positions
+
+
+def _rows(dates, values):
+    return np.searchsorted(dates, pd.to_datetime(values).values.astype("datetime64[ns]"))
+
+
+def run_portfolio(trades, prices, capital, fed_rates, transaction_cost, notional=None, spy=None):
+    """Daily mark-to-market accounting for a set of trades sharing one pool of capital.
+
+    trades is a results frame or TradeBuffer with Ticker, Entry Date and Exit
+    Date; positions are bought at the entry-date open and sold at the exit-date
+    close. Each trade wants notional dollars of stock (capital if not given), or
+    its 'Shares' column when present.
+    When a day's new trades would take gross exposure at that close above
+    capital, they are all scaled down pro rata to fit beside the positions
+    already open, and each keeps that scale until it exits, so a position is
+    never resized without a trade. fed_rates is the financing
+    rate in percent for each panel date, filled from the nearest known rate where
+    missing; only positions carried past a close are financed. With spy given, the
+    book also carries a SPY short equal to its long exposure, rebalanced at each close;
+    'Hedge PnL' is that short's PnL, added to equity as in run_backtest.
+
+    Returns a frame indexed by date with PnL, costs, financing, equity, gross
+    exposure and the scale applied to that day's new positions.
+    """
+    dates = prices.dates
+    n_dates, n_tickers = len(dates), len(prices.tickers)
+    opens = prices.fields["Open"]
+    # Mark missing closes at the last known price
+    closes = pd.DataFrame(prices.fields["Close"]).ffill().to_numpy()
+
+    cols = pd.Index(prices.tickers).get_indexer(np.asarray(trades["Ticker"]))
+    entry_rows = _rows(dates, trades["Entry Date"])
+    exit_rows = _rows(dates, trades["Exit Date"])
+    ok = (cols >= 0) & (entry_rows < n_dates) & (exit_rows < n_dates)
+    cols, entry_rows, exit_rows = cols[ok], entry_rows[ok], exit_rows[ok]
+    if "Shares" in trades:
+        shares = np.asarray(trades["Shares"], dtype=np.float64)[ok]
+    else:
+        shares = (capital if notional is None else notional) // opens[entry_rows, cols]
+
+    # Shares wanted at each open, as a dates x tickers matrix; trades grouped by entry day
+    bought = np.zeros((n_dates, n_tickers))
+    np.add.at(bought, (entry_rows, cols), shares)
+    order = np.argsort(entry_rows, kind="stable")
+    bounds = np.searchsorted(entry_rows[order], np.arange(n_dates + 1))
+
+    # Each day's entries are scaled once against the exposure already open; a trade's
+    # scale is fixed at entry, so its exit sells exactly what it bought
+    scale = np.ones(n_dates)
+    exited = np.zeros((n_dates, n_tickers))
+    held = np.zeros(n_tickers)  # Shares open going into each day
+    holdings = np.zeros((n_dates, n_tickers))
+    for t in range(n_dates):
+        new_exposure = np.nansum(bought[t] * closes[t])
+        if new_exposure > 0:
+            room = capital - np.nansum(held * closes[t])
+            scale[t] = min(1.0, max(room, 0.0) / new_exposure)
+            day = order[bounds[t]:bounds[t + 1]]
+            np.add.at(exited, (exit_rows[day], cols[day]), shares[day] * scale[t])
+        holdings[t] = held + bought[t] * scale[t]
+        held = holdings[t] - exited[t]
+
+    carried = holdings - exited  # Still held after each day's exits
+    entered = bought * scale[:, None]
+
+    price_change = np.nan_to_num(np.diff(closes, axis=0))
+    carry_pnl = np.vstack([np.zeros((1, n_tickers)), carried[:-1] * price_change])
+    entry_pnl = np.nan_to_num(entered * (closes - opens))
+    pnl = (carry_pnl + entry_pnl).sum(axis=1)
+
+    txn_costs = (entered + exited).sum(axis=1) * transaction_cost
+    gross_exposure = np.nansum(holdings * closes, axis=1)
+    carried_exposure = np.nansum(carried * closes, axis=1)
+    days_held = np.append(np.diff(dates) // np.timedelta64(1, "D"), 1)
+    rates = pd.Series(np.asarray(fed_rates, dtype=np.float64)).ffill().bfill().to_numpy()
+    financing = carried_exposure * (rates / 100 + LONG_SPREAD) * days_held / 365
+
+    hedge_pnl = np.zeros(n_dates)
+    if spy is not None:
+        spy_open = spy["Open"].reindex(pd.DatetimeIndex(dates)).ffill().to_numpy()
+        spy_close = spy["Close"].reindex(pd.DatetimeIndex(dates)).ffill().to_numpy()
+        entry_exposure = np.nansum(entered * opens, axis=1)
+        hedge_pnl[1:] = -carried_exposure[:-1] / spy_close[:-1] * np.diff(spy_close)
+        hedge_pnl += -entry_exposure / spy_open * (spy_close - spy_open)
+        hedge_pnl = np.nan_to_num(hedge_pnl)
+
+    net_pnl = pnl + hedge_pnl - txn_costs - financing
+    return pd.DataFrame({
+        'PnL': pnl,
+        'Hedge PnL': hedge_pnl,
+        'Transaction Costs': txn_costs,
+        'Financing': financing,
+        'Net PnL': net_pnl,
+        'Equity': capital + np.cumsum(net_pnl),
+        'Gross Exposure': gross_exposure,
+        'Scale': scale,
+    }, index=pd.DatetimeIndex(dates, name='Date'))
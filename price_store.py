@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = os.path.join("cache", "prices")
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def yfinance_fetcher(tickers, start, end):
+    """Daily OHLCV frames per ticker from Yahoo Finance."""
+    import yfinance as yf
+
+    data = yf.download(tickers, start=start, end=end, group_by="ticker", progress=False)
+    frames = {}
+    for ticker in tickers:
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            df = data[ticker]
+        else:
+            df = data
+        frames[ticker] = df.reindex(columns=FIELDS).dropna(how="all")
+    return frames
+
+
+class Panel:
+    """Dates x tickers arrays for each OHLCV field, aligned on the union of dates.
+
+    panel[ticker] returns that ticker's OHLCV frame, matching the layout of a
+    group_by='ticker' yf.download result.
+    """
+
+    def __init__(self, dates, tickers, fields):
+        self.dates = dates
+        self.index = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.columns = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.fields = fields
+
+    def __contains__(self, ticker):
+        return ticker in self.columns
+
+    def __getitem__(self, ticker):
+        i = self.columns[ticker]
+        return pd.DataFrame({field: self.fields[field][:, i] for field in FIELDS}, index=self.index)
+
+
+class PriceStore:
+    """Local OHLCV store with one memory-mapped NumPy block per ticker.
+
+    Each ticker keeps a (rows x 5) float64 array of FIELDS, an int64 nanosecond
+    date array and a small JSON file recording the fetched [start, end) window.
+    ensure() fetches only the parts of a window that are not on disk yet.
+    """
+
+    def __init__(self, interval="1d", fetcher=yfinance_fetcher, root=STORE_DIR):
+        self.root = os.path.join(root, interval)
+        self.fetcher = fetcher
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, ticker, suffix):
+        return os.path.join(self.root, f"{ticker}{suffix}")
+
+    def _meta(self, ticker):
+        path = self._path(ticker, ".json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            meta = json.load(f)
+        return pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"])
+
+    def ensure(self, tickers, start, end):
+        """Fetch whatever part of [start, end) each ticker is missing, batched by gap."""
+        start = pd.Timestamp(start)
+        end = min(pd.Timestamp(end), pd.Timestamp.now(tz=pd.Timestamp(end).tz).normalize() + pd.Timedelta(days=1))
+        gaps = defaultdict(list)
+        for ticker in dict.fromkeys(tickers):
+            meta = self._meta(ticker)
+            if meta is None:
+                gaps[(start, end)].append(ticker)
+                continue
+            have_start, have_end = meta
+            if start < have_start:
+                gaps[(start, have_start)].append(ticker)
+            if end > have_end:
+                gaps[(have_end, end)].append(ticker)
+
+        for (gap_start, gap_end), group in gaps.items():
+            if gap_start >= gap_end:
+                continue
+            frames = self.fetcher(group, gap_start, gap_end)
+            for ticker in group:
+                self._merge(ticker, frames.get(ticker), gap_start, gap_end)
+
+    def _merge(self, ticker, frame, start, end):
+        dates, values = self.load(ticker)
+        dates, values = np.array(dates.view(np.int64)), np.array(values)
+        if frame is not None and not frame.empty:
+            index = pd.DatetimeIndex(frame.index)
+            if index.tz is not None:
+                index = index.tz_convert("UTC")
+            dates = np.concatenate([dates, index.as_unit("ns").asi8])
+            values = np.concatenate([values, frame.reindex(columns=FIELDS).to_numpy(dtype=np.float64)])
+            # Keep the newest copy of any date fetched twice
+            order = np.argsort(dates, kind="stable")
+            dates, values = dates[order], values[order]
+            keep = np.append(dates[1:] != dates[:-1], True)
+            dates, values = dates[keep], values[keep]
+
+        np.save(self._path(ticker, ".dates.npy"), dates)
+        np.save(self._path(ticker, ".npy"), values)
+        meta = self._meta(ticker)
+        if meta is not None:
+            start, end = min(start, meta[0]), max(end, meta[1])
+        with open(self._path(ticker, ".json"), "w") as f:
+            json.dump({"start": start.isoformat(), "end": end.isoformat()}, f)
+
+    def load(self, ticker):
+        """Zero-copy (dates, values) memory maps; empty arrays for unknown tickers."""
+        path = self._path(ticker, ".npy")
+        if not os.path.exists(path):
+            return np.empty(0, dtype="datetime64[ns]"), np.empty((0, len(FIELDS)))
+        dates = np.load(self._path(ticker, ".dates.npy"), mmap_mode="r").view("datetime64[ns]")
+        return dates, np.load(path, mmap_mode="r")
+
+    def _window(self, dates, start, end):
+        lo = 0 if start is None else np.searchsorted(dates, _as_datetime64(start), "left")
+        hi = len(dates) if end is None else np.searchsorted(dates, _as_datetime64(end), "left")
+        return lo, hi
+
+    def frame(self, ticker, start=None, end=None):
+        """One ticker's OHLCV frame over [start, end), backed by the memory map."""
+        dates, values = self.load(ticker)
+        lo, hi = self._window(dates, start, end)
+        index = pd.DatetimeIndex(dates[lo:hi])
+        if self._is_utc(ticker):
+            index = index.tz_localize("UTC")
+        return pd.DataFrame(values[lo:hi], index=index, columns=FIELDS, copy=False)
+
+    def _is_utc(self, ticker):
+        meta = self._meta(ticker)
+        return meta is not None and meta[0].tz is not None
+
+    def panel(self, tickers, start=None, end=None, fields=FIELDS):
+        """Align tickers on the union of their dates as dates x tickers arrays, one per field."""
+        tickers = list(dict.fromkeys(tickers))
+        blocks = []
+        for ticker in tickers:
+            dates, values = self.load(ticker)
+            lo, hi = self._window(dates, start, end)
+            blocks.append((dates[lo:hi], values[lo:hi]))
+
+        all_dates = np.unique(np.concatenate([d for d, _ in blocks])) if blocks else np.empty(0, "datetime64[ns]")
+        arrays = {field: np.full((len(all_dates), len(tickers)), np.nan) for field in fields}
+        for col, (dates, values) in enumerate(blocks):
+            rows = np.searchsorted(all_dates, dates)
+            for field in fields:
+                arrays[field][rows, col] = values[:, FIELDS.index(field)]
+        return Panel(all_dates, tickers, arrays)
+
+    def version(self, tickers):
+        """Hash of the stored windows and sizes, changing whenever new data lands."""
+        digest = hashlib.sha256()
+        for ticker in sorted(set(tickers)):
+            meta = self._meta(ticker)
+            path = self._path(ticker, ".npy")
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            digest.update(f"{ticker}:{meta}:{size};".encode())
+        return digest.hexdigest()[:16]
+
+
+def _as_datetime64(value):
+    ts = pd.Timestamp(value)
+    if ts.tz is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.to_datetime64().astype("datetime64[ns]")
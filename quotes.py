@@ -0,0 +1,64 @@
+import threading
+import time
+
+import client
+
+QUOTE_TTL = 1.0  # Seconds a batch of quotes is served from memory
+MAX_SYMBOLS_PER_REQUEST = 200
+
+
+class QuoteCache:
+    """Latest IEX quotes for a watched symbol list, refreshed in one batched request."""
+
+    def __init__(self, ttl=QUOTE_TTL, feed="iex"):
+        self.ttl = ttl
+        self.feed = feed
+        self.symbols = set()
+        self._quotes = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def watch(self, symbols):
+        """Add symbols to the batch; they are fetched on the next refresh."""
+        with self._lock:
+            new = set(symbols) - self.symbols
+            if new:
+                self.symbols |= new
+                self._fetched_at = 0.0
+
+    def refresh(self):
+        symbols = sorted(self.symbols)
+        quotes = {}
+        for i in range(0, len(symbols), MAX_SYMBOLS_PER_REQUEST):
+            chunk = symbols[i:i + MAX_SYMBOLS_PER_REQUEST]
+            response = client.get(
+                f"{client.DATA_URL}/v2/stocks/quotes/latest",
+                endpoint="quotes",
+                params={"symbols": ",".join(chunk), "feed": self.feed},
+            )
+            response.raise_for_status()
+            quotes.update(response.json().get("quotes", {}))
+        self._quotes = quotes
+        self._fetched_at = time.monotonic()
+
+    def get(self, symbol):
+        """Return the cached quote for symbol, refreshing the whole batch if stale."""
+        if symbol not in self.symbols:
+            self.watch([symbol])
+        if time.monotonic() - self._fetched_at >= self.ttl:
+            with self._lock:
+                # Another thread may have refreshed while we waited for the lock
+                if time.monotonic() - self._fetched_at >= self.ttl:
+                    self.refresh()
+        return self._quotes.get(symbol)
+
+
+cache = QuoteCache()
+
+
+def watch(symbols):
+    cache.watch(symbols)
+
+
+def get_quote(symbol):
+    return cache.get(symbol)
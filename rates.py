@@ -0,0 +1,57 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import requests
+
+CACHE_DIR = "cache"
+EFFR_URL = "https://markets.newyorkfed.org/api/rates/unsecured/effr/search.json"
+
+
+class RateCurve:
+    """Effective fed funds rate history, fetched once and cached on disk.
+
+    Rates are forward-filled onto every calendar day, so weekends and holidays
+    use the last published rate and a lookup is plain index arithmetic.
+    """
+
+    def __init__(self, start, end, cache_dir=CACHE_DIR):
+        path = os.path.join(cache_dir, f"effr_{start}_{end}.csv")
+        if os.path.exists(path):
+            series = pd.read_csv(path, index_col=0, parse_dates=True)["rate"]
+        else:
+            series = self.fetch(start, end)
+            os.makedirs(cache_dir, exist_ok=True)
+            series.to_csv(path)
+
+        days = pd.date_range(series.index.min(), end, freq="D")
+        self.first_day = days[0].to_datetime64().astype("datetime64[D]")
+        self.values = series.reindex(days).ffill().to_numpy()
+
+    @staticmethod
+    def fetch(start, end):
+        response = requests.get(EFFR_URL, params={"startDate": start, "endDate": end, "type": "rate"})
+        response.raise_for_status()
+        rows = response.json()["refRates"]
+        series = pd.Series(
+            [float(x["percentRate"]) for x in rows],
+            index=pd.to_datetime([x["effectiveDate"] for x in rows]),
+            name="rate",
+        )
+        return series.sort_index()
+
+    def lookup(self, dates):
+        """Rates in percent for an array of dates; NaN before the curve starts."""
+        days = np.asarray(pd.to_datetime(dates).values.astype("datetime64[D]"))
+        idx = (days - self.first_day).astype(np.int64)
+        out = self.values[np.clip(idx, 0, len(self.values) - 1)]
+        return np.where(idx < 0, np.nan, out)
+
+    def rate(self, date):
+        return float(self.lookup([pd.Timestamp(date)])[0])
+
+
+@lru_cache(maxsize=None)
+def get_curve(start, end):
+    return RateCurve(start, end)
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from backtest_engine import run_backtest
+
+CACHE_DIR = os.path.join("cache", "results")
+SCHEMA_VERSION = 3  # Bump whenever RESULT_SCHEMA or the backtest logic changes
+EVENT_COLUMNS = ["Announced", "Trade Date", "Index Change", "Ticker", "Action"]
+
+# One schema for every backtest output; un-traded events are cached too, with Traded False.
+# Key identifies a result, Event the event row it belongs to (see ResultCache).
+RESULT_SCHEMA = pa.schema([
+    ("Key", pa.uint64()),
+    ("Event", pa.uint64()),
+    ("Traded", pa.bool_()),
+    ("Ticker", pa.string()),
+    ("Entry Date", pa.timestamp("ns")),
+    ("Exit Date", pa.timestamp("ns")),
+    ("Holding Period (Days)", pa.int64()),
+    ("Entry Price", pa.float64()),
+    ("Exit Price", pa.float64()),
+    ("Shares", pa.float64()),
+    ("PnL", pa.float64()),
+    ("Hedge PnL", pa.float64()),
+    ("Net PnL", pa.float64()),
+    ("Transaction Costs", pa.float64()),
+])
+RESULT_COLUMNS = RESULT_SCHEMA.names[3:]
+
+
+def write_results(results, path):
+    """Write a results frame or TradeBuffer in RESULT_SCHEMA to parquet, tagged with SCHEMA_VERSION."""
+    arrays = []
+    for field in RESULT_SCHEMA:
+        if field.name in results:
+            arrays.append(pa.array(np.asarray(results[field.name]), type=field.type, from_pandas=True))
+        elif field.name == "Traded":
+            arrays.append(pa.array(np.ones(len(results), dtype=bool)))
+        else:
+            arrays.append(pa.nulls(len(results), field.type))
+    schema = RESULT_SCHEMA.with_metadata({"schema_version": str(SCHEMA_VERSION)})
+    table = pa.Table.from_arrays(arrays, schema=schema)
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_results(path):
+    """Results written by write_results(), or None if missing or from another schema version."""
+    if not os.path.exists(path):
+        return None
+    table = pq.read_table(path)
+    metadata = table.schema.metadata or {}
+    if metadata.get(b"schema_version") != str(SCHEMA_VERSION).encode():
+        return None
+    # Keep uint64 columns uint64 even when they hold nulls
+    return table.to_pandas(types_mapper={pa.uint64(): pd.UInt64Dtype()}.get)
+
+
+def export_csv(results, path):
+    """Optional CSV copy of results, always with the RESULT_COLUMNS layout."""
+    results.reindex(columns=RESULT_COLUMNS).to_csv(path, index=False)
+
+
+def _run_id(params, seed):
+    return json.dumps(params, sort_keys=True, default=str) + f"|{seed}|{SCHEMA_VERSION}"
+
+
+def _hash_key(text):
+    # pandas row hashing takes a 16-character key
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def holding_draws(events, seed):
+    """One uint64 holding-period draw per event, from a hash of its row and seed."""
+    rows = events[[c for c in EVENT_COLUMNS if c in events]].reset_index(drop=True)
+    return pd.util.hash_pandas_object(rows, index=False, hash_key=_hash_key(f"draw|{seed}")).to_numpy()
+
+
+class ResultCache:
+    """Per-event backtest results on disk, keyed by everything that determines them.
+
+    An event's key hashes its row, its fed rate and share cap, the run
+    parameters, the seed and the price-data version of its ticker (and of SPY
+    when hedged). Holding periods are drawn per event from a hash of the row
+    and seed, so an event's result never depends on which other events run
+    with it, and a re-run only backtests events whose key is not cached yet.
+
+    Each set of run parameters and seed gets its own file, and within it an
+    event keeps only its latest result, so new price data or share caps
+    replace rows instead of piling up beside them.
+    """
+
+    def __init__(self, name, root=CACHE_DIR):
+        os.makedirs(root, exist_ok=True)
+        self.name = name
+        self.root = root
+
+    def path(self, params, seed):
+        return os.path.join(self.root, f"{self.name}_{_hash_key(_run_id(params, seed))}.parquet")
+
+    def keys(self, events, params, seed, versions, fed_rates, max_shares=None):
+        """(keys, draws): a uint64 key and a uint64 holding-period draw per event."""
+        rows = events[[c for c in EVENT_COLUMNS if c in events]].reset_index(drop=True)
+        run = _run_id(params, seed)
+        draws = holding_draws(events, seed)
+        inputs = rows.assign(
+            fed_rate=np.broadcast_to(np.asarray(fed_rates, dtype=np.float64), len(events)),
+            max_shares=np.broadcast_to(np.asarray(np.nan if max_shares is None else max_shares, dtype=np.float64), len(events)),
+            version=np.asarray(versions, dtype=object),
+        )
+        keys = pd.util.hash_pandas_object(inputs, index=False, hash_key=_hash_key(run)).to_numpy()
+        return keys, draws
+
+    def run(self, events, prices, store, fed_rates, portfolio_size, transaction_costs, overnight_costs,
+            params, seed, spy=None, hedge_ratio=1.0, max_shares=None, out=None):
+        """run_backtest() over events, computing only events missing from the cache.
+
+        params must describe everything the cost functions and sizing depend on,
+        since functions themselves are not hashed. Returns the traded events'
+        results in event order, indexed like events, or appends them to the
+        TradeBuffer out and returns that.
+        """
+        tickers = events["Ticker"].to_numpy()
+        spy_version = store.version(["SPY"]) if spy is not None else ""
+        ticker_versions = {t: store.version([t]) for t in pd.unique(tickers)}
+        versions = [f"{ticker_versions[t]}:{spy_version}" for t in tickers]
+        params = {**params, "portfolio_size": portfolio_size, "hedge_ratio": hedge_ratio if spy is not None else None,
+                  "last_date": str(prices.dates[-1])}
+        keys, draws = self.keys(events, params, seed, versions, fed_rates, max_shares)
+        # The last date moves with every price update, so it keys rows but not files
+        path = self.path({k: v for k, v in params.items() if k != "last_date"}, seed)
+
+        cached = read_results(path)
+        if cached is None:
+            cached = pd.DataFrame(columns=RESULT_SCHEMA.names)
+        missing = ~pd.Index(keys).isin(cached["Key"])
+        # Rows for these events under keys they no longer have can never be read again
+        superseded = pd.Index(cached["Event"]).isin(draws) & ~pd.Index(cached["Key"]).isin(keys)
+        cached = cached[~superseded]
+
+        if missing.any():
+            fresh_events = events[missing]
+            fed = np.broadcast_to(np.asarray(fed_rates, dtype=np.float64), len(events))[missing]
+            caps = None if max_shares is None else np.broadcast_to(max_shares, len(events))[missing]
+            results = run_backtest(fresh_events, prices, fed, portfolio_size, transaction_costs, overnight_costs,
+                                   spy=spy, hedge_ratio=hedge_ratio, max_shares=caps, draws=draws[missing])
+            fresh = results.reindex(fresh_events.index)
+            fresh["Ticker"] = fresh_events["Ticker"].to_numpy()
+            fresh["Holding Period (Days)"] = fresh["Holding Period (Days)"].fillna(0).astype(np.int64)
+            fresh.insert(0, "Traded", fresh_events.index.isin(results.index))
+            fresh.insert(0, "Event", draws[missing])
+            fresh.insert(0, "Key", keys[missing])
+            cached = fresh if cached.empty else pd.concat([cached, fresh], ignore_index=True)
+            print(f"Backtested {missing.sum()} new or changed events; {len(events) - missing.sum()} from cache")
+        if missing.any() or superseded.any():
+            write_results(cached, path)
+
+        found = cached.drop_duplicates("Key", keep="last").set_index("Key").reindex(keys)
+        found.index = events.index
+        found = found[found["Traded"].to_numpy(dtype=bool)]
+        if out is not None:
+            out.extend_frame(found)
+            return out
+        return found[RESULT_COLUMNS]
@@ -0,0 +1,202 @@
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from market_data import fetch_minute_bars
+from price_store import PriceStore
+from stream import QuoteStream
+
+# === Parameters ===
+SYMBOLS = ['AAPL', 'COST', 'AMZN', 'GOOG', 'BRK.B']  # Default universe, as in scalp.py
+DAYS = 30
+PROFIT_TARGETS = [0.0005, 0.001, 0.002, 0.005]
+STOPS = [0.00025, 0.0005, 0.001, 0.002]
+COOLDOWNS = [0, 60, 300]  # Seconds
+NOTIONAL = 1000.0  # Dollars per trade
+LOOKAHEAD = 256  # Ticks scanned per step when searching for exits
+EASTERN = 'US/Eastern'
+
+minute_store = PriceStore(interval="1Min", fetcher=fetch_minute_bars)
+
+
+# === Replay ===
+def parameter_grid(profit_targets=PROFIT_TARGETS, stops=STOPS, cooldowns=COOLDOWNS):
+    """Every (profit target, stop, cooldown) combination as three flat arrays."""
+    pt, sl, cd = np.meshgrid(profit_targets, stops, cooldowns, indexing="ij")
+    return pt.ravel(), sl.ravel(), cd.ravel()
+
+
+def session_ends(times):
+    """True at the last tick of each US/Eastern trading day."""
+    days = pd.DatetimeIndex(times).tz_localize("UTC").tz_convert(EASTERN).normalize().asi8
+    return np.append(days[1:] != days[:-1], True)
+
+
+def replay(times, prices, profit_target, stop, cooldown, exit_mode="monitor", lookahead=LOOKAHEAD):
+    """Run ScalpEngine's rules over one symbol's prices for every grid point at once.
+
+    times are sorted datetime64[ns] and prices the bid (or bar close) at each
+    tick; profit_target, stop and cooldown are equal-length arrays, one entry
+    per grid point. As in the engine, each trade enters at the latest price,
+    exits at the first tick at or beyond either threshold, then re-enters at
+    the latest price once cooldown seconds have passed. "monitor" exits at the
+    tick's price; "bracket" fills take-profits at the limit and stops at the
+    tick's price. Open positions are closed at each session's last tick,
+    like liquidate() at the close.
+
+    Each step scans the next `lookahead` ticks of every still-running grid
+    point in one gather, so the Python loop runs per trade, not per tick.
+    Returns per-grid-point arrays: trades, wins, and the summed trade return.
+    """
+    times = np.asarray(times, dtype="datetime64[ns]").view(np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    profit_target, stop = np.asarray(profit_target, np.float64), np.asarray(stop, np.float64)
+    cooldown = (np.asarray(cooldown, np.float64) * 1e9).astype(np.int64)
+    n, size = len(prices), len(profit_target)
+    closes = session_ends(times) if n else np.zeros(0, bool)
+    # First tick at or after each tick that is not a session's last, n if none
+    opens = np.flatnonzero(~closes)
+    next_open = np.append(opens, n)[np.searchsorted(opens, np.arange(n))]
+
+    trades = np.zeros(size, np.int64)
+    wins = np.zeros(size, np.int64)
+    total = np.zeros(size)
+    entry = np.zeros(size, np.int64)
+    search = np.ones(size, np.int64)
+    entry[:] = next_open[0] if n else 0
+    search[:] = entry + 1
+    running = np.full(size, n > 1 and entry[0] < n - 1)
+    offsets = np.arange(lookahead)
+
+    while running.any():
+        g = np.flatnonzero(running)
+        idx = search[g, None] + offsets
+        inside = idx < n
+        idx = np.minimum(idx, n - 1)
+        window = prices[idx]
+        entry_price = prices[entry[g]]
+        upper = entry_price * (1 + profit_target[g])
+        lower = entry_price * (1 - stop[g])
+        hit = inside & ((window >= upper[:, None]) | (window <= lower[:, None]) | closes[idx])
+
+        found = hit.any(axis=1)
+        exit_idx = idx[found, hit[found].argmax(axis=1)]
+        exit_price = prices[exit_idx]
+        if exit_mode == "bracket":
+            exit_price = np.where(exit_price >= upper[found], upper[found], exit_price)
+        ret = exit_price / entry_price[found] - 1
+        done = g[found]
+        trades[done] += 1
+        wins[done] += ret > 0
+        total[done] += ret
+
+        # Re-enter at the latest tick once the cooldown is over, skipping the close
+        nxt = next_open[np.searchsorted(times, times[exit_idx] + cooldown[done], "right") - 1]
+        entry[done] = nxt
+        search[done] = nxt + 1
+        running[done[nxt >= n - 1]] = False
+
+        waiting = g[~found]
+        search[waiting] += lookahead
+        running[waiting[search[waiting] >= n]] = False
+
+    return trades, wins, total
+
+
+def _replay_symbol(symbol, times, prices, grid, exit_mode):
+    profit_target, stop, cooldown = grid
+    trades, wins, total = replay(times, prices, profit_target, stop, cooldown, exit_mode)
+    return pd.DataFrame({
+        'Symbol': symbol,
+        'Profit Target': profit_target,
+        'Stop': stop,
+        'Cooldown': cooldown,
+        'Trades': trades,
+        'Wins': wins,
+        'Losses': trades - wins,
+        'Total Return': total,
+        'PnL': total * NOTIONAL,
+    })
+
+
+def sweep(series, grid=None, exit_mode="monitor", workers=None):
+    """Replay every symbol over the whole grid, one symbol per worker process.
+
+    series maps symbol -> (times, prices). Returns one row per symbol and grid
+    point, and the grid's totals across symbols sorted by PnL.
+    """
+    grid = grid or parameter_grid()
+    symbols = list(series)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(
+            _replay_symbol, symbols,
+            [series[s][0] for s in symbols], [series[s][1] for s in symbols],
+            [grid] * len(symbols), [exit_mode] * len(symbols),
+        ))
+    results = pd.concat(frames, ignore_index=True)
+    totals = (results.groupby(['Profit Target', 'Stop', 'Cooldown'])[['Trades', 'Wins', 'Losses', 'PnL']]
+              .sum().sort_values('PnL', ascending=False).reset_index())
+    totals['Win Rate'] = totals['Wins'] / totals['Trades'].where(totals['Trades'] > 0)
+    return results, totals
+
+
+# === Data ===
+def minute_series(symbols, days=DAYS):
+    """(times, closes) of each symbol's market-hours minute bars from the local store."""
+    end = pd.Timestamp.now(tz="UTC")
+    start = end - pd.Timedelta(days=days)
+    minute_store.ensure(symbols, start, end)
+    series = {}
+    for symbol in symbols:
+        df = minute_store.frame(symbol, start, end)
+        df = df.tz_convert(EASTERN).between_time('09:30', '16:00', inclusive='left')
+        if len(df):
+            series[symbol] = (df.index.tz_convert("UTC").tz_localize(None).values, df['Close'].to_numpy())
+    return series
+
+
+def quote_series(path):
+    """(times, bids) per symbol from quotes saved by QuoteRecorder."""
+    quotes = pd.read_parquet(path, columns=['S', 't', 'bp'])
+    quotes = quotes.sort_values('t', kind='stable')
+    return {
+        symbol: (group['t'].values.astype("datetime64[ns]"), group['bp'].to_numpy(dtype=np.float64))
+        for symbol, group in quotes.groupby('S', sort=False)
+    }
+
+
+class QuoteRecorder(QuoteStream):
+    """QuoteStream that also keeps every quote so a session can be replayed later."""
+
+    def __init__(self, symbols, url=None):
+        super().__init__(symbols, url)
+        self.rows = []
+
+    def _on_quote(self, msg):
+        self.rows.append((msg["S"], msg["t"], float(msg["bp"]), float(msg["ap"])))
+        super()._on_quote(msg)
+
+    def save(self, path):
+        quotes = pd.DataFrame(self.rows, columns=['S', 't', 'bp', 'ap'])
+        quotes['t'] = pd.to_datetime(quotes['t'], utc=True).dt.tz_localize(None)
+        quotes.to_parquet(path, index=False)
+
+
+# === Main Execution ===
+if __name__ == "__main__":
+    # python scalp_sim.py [--quotes quotes.parquet] [SYMBOL ...]
+    args = sys.argv[1:]
+    if args[:1] == ['--quotes']:
+        series = quote_series(args[1])
+        symbols = args[2:]
+        if symbols:
+            series = {s: series[s] for s in symbols if s in series}
+    else:
+        series = minute_series(args or SYMBOLS)
+
+    results, totals = sweep(series, exit_mode="bracket")
+    results.to_csv('scalp_sweep.csv', index=False)
+    print(f"\nBest parameters over {len(series)} symbols:")
+    print(totals.head(10).to_string(index=False))
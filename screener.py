@@ -0,0 +1,161 @@
+import asyncio
+import csv
+from abc import ABC, abstractmethod
+import hashlib
+import io
+import json
+import os
+
+import client
+
+SCREEN_INTERVAL = 60  # Seconds between polls of every source
+
+
+class Source(ABC):
+    """A screener feed that only parses its payload when the payload changes.
+
+    Subclasses implement fetch(), returning the raw payload or None when the
+    server or filesystem says nothing changed, and parse(payload) -> tickers.
+    poll() adds a content hash on top, so an unchanged body is never parsed.
+    """
+
+    def __init__(self):
+        self.digest = None
+        self.tickers = []
+
+    @abstractmethod
+    def fetch(self):
+        """The raw payload, or None if it has not changed."""
+
+    @abstractmethod
+    def parse(self, payload):
+        """Tickers in payload, in the source's order."""
+
+    def poll(self):
+        """The source's tickers, or None if they cannot have changed since the last poll."""
+        payload = self.fetch()
+        if payload is None:
+            return None
+        digest = hashlib.sha256(payload).digest()
+        if digest == self.digest:
+            return None
+        self.tickers = self.parse(payload)
+        self.digest = digest
+        return self.tickers
+
+
+class HttpSource(Source):
+    """Source fetched with conditional GETs (If-None-Match / If-Modified-Since).
+
+    Requests go through client's pooled session; third-party URLs are sent
+    without the session's Alpaca credentials.
+    """
+
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self.validators = {}
+
+    def get(self, headers):
+        third_party = {"accept": "*/*", "APCA-API-KEY-ID": None, "APCA-API-SECRET-KEY": None}
+        return client.get(self.url, endpoint="screener", headers={**headers, **third_party})
+
+    def fetch(self):
+        response = self.get(self.validators)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        self.validators = {}
+        if "ETag" in response.headers:
+            self.validators["If-None-Match"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            self.validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        return response.content
+
+
+def _csv_tickers(payload):
+    # Only the Ticker column is read; other fields are never converted
+    rows = csv.reader(io.StringIO(payload.decode("utf-8-sig")))
+    column = next(rows).index("Ticker")
+    return [row[column] for row in rows if len(row) > column]
+
+
+class FinvizSource(HttpSource):
+    """Tickers from a Finviz screener CSV export."""
+
+    def parse(self, payload):
+        return _csv_tickers(payload)
+
+
+class MostActivesSource(HttpSource):
+    """Alpaca's most-active stocks screener."""
+
+    def __init__(self, by="volume", top=20):
+        super().__init__(f"{client.DATA_URL}/v1beta1/screener/stocks/most-actives?by={by}&top={top}")
+
+    def get(self, headers):
+        return client.get(self.url, endpoint="screener", headers=headers)
+
+    def parse(self, payload):
+        return [row["symbol"] for row in json.loads(payload)["most_actives"]]
+
+
+class FileSource(Source):
+    """One ticker per line (or a CSV with a Ticker column) in a local file."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.stat = None
+
+    def fetch(self):
+        stat = os.stat(self.path)
+        if (stat.st_mtime_ns, stat.st_size) == self.stat:
+            return None
+        self.stat = (stat.st_mtime_ns, stat.st_size)
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def parse(self, payload):
+        lines = [line.strip() for line in payload.decode("utf-8-sig").splitlines() if line.strip()]
+        if lines and "," in lines[0]:
+            return _csv_tickers(payload)
+        return lines
+
+
+class Screener:
+    """Union of several sources' tickers, reported as (added, dropped) changes.
+
+    A source whose poll fails keeps its last tickers, so a network error never
+    looks like every ticker being dropped.
+    """
+
+    def __init__(self, sources, interval=SCREEN_INTERVAL):
+        self.sources = list(sources)
+        self.interval = interval
+        self.current = []
+
+    def poll(self):
+        """(added, dropped) ticker lists since the previous poll; both empty if nothing changed."""
+        changed = False
+        for source in self.sources:
+            try:
+                changed |= source.poll() is not None
+            except Exception as e:
+                print(f"Error polling {type(source).__name__}: {e}")
+        if not changed:
+            return [], []
+        tickers = list(dict.fromkeys(t for source in self.sources for t in source.tickers))
+        previous, latest = set(self.current), set(tickers)
+        added = [t for t in tickers if t not in previous]
+        dropped = [t for t in self.current if t not in latest]
+        self.current = tickers
+        return added, dropped
+
+    async def updates(self):
+        """Async stream of (added, dropped) changes, polling every interval seconds."""
+        while True:
+            added, dropped = await asyncio.to_thread(self.poll)
+            if added or dropped:
+                yield added, dropped
+            await asyncio.sleep(self.interval)
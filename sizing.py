@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+ADV_WINDOW = 20  # Trading days in the average daily volume
+ADV_MIN_PERIODS = 5  # Fewer days of history give no ADV, and so no trade
+ADV_PARTICIPATION = 0.01  # Largest position as a fraction of ADV
+
+
+def adv_matrix(prices, window=ADV_WINDOW, min_periods=ADV_MIN_PERIODS):
+    """Rolling average daily volume for every ticker at once (dates x tickers)."""
+    volume = pd.DataFrame(prices.fields["Volume"])
+    return volume.rolling(window, min_periods=min_periods).mean().to_numpy()
+
+
+def position_limits(events, prices, participation=ADV_PARTICIPATION, adv=None, capital=None):
+    """Largest share quantity per event, from ADV known before the trade-date open.
+
+    ADV is read from the row before the trade date, so a trade never sees its
+    own day's volume. It averages up to ADV_WINDOW days; events with fewer than
+    ADV_MIN_PERIODS days of volume history get a cap of zero.
+    With capital given, each cap is also at most capital dollars of stock at
+    the trade-date open.
+    """
+    if adv is None:
+        adv = adv_matrix(prices)
+    trade_dates = pd.to_datetime(events["Trade Date"]).values.astype("datetime64[ns]")
+    cols = pd.Index(prices.tickers).get_indexer(events["Ticker"].to_numpy())
+    rows = np.searchsorted(prices.dates, trade_dates, "left") - 1
+    known = (rows >= 0) & (cols >= 0)
+    event_adv = np.where(known, adv[np.maximum(rows, 0), np.maximum(cols, 0)], np.nan)
+    limits = np.nan_to_num(np.floor(event_adv * participation), nan=0.0)
+    if capital is not None:
+        open_rows = np.minimum(rows + 1, len(prices.dates) - 1)
+        entry_price = np.where(cols >= 0, prices.fields["Open"][open_rows, np.maximum(cols, 0)], np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            limits = np.fmin(limits, capital // entry_price)
+    return limits
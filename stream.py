@@ -0,0 +1,168 @@
+import asyncio
+import json
+import threading
+
+import websockets
+
+import client
+
+# Point "stream-url" in .env at fake_feed.py to run without the network
+STREAM_URL = client.config.get("stream-url", "wss://stream.data.alpaca.markets/v2/iex")
+TRADE_STREAM_URL = client.config.get("trade-stream-url", "wss://paper-api.alpaca.markets/stream")
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+
+
+class QuoteStream:
+    """Websocket quote subscriber that keeps the latest bid/ask per symbol in memory.
+
+    Threads block in wait_for_update(); coroutines running on the stream's own
+    event loop can await wait() instead. With on_bar given, the stream also
+    subscribes to minute bars and passes each bar message to it; quotes=False
+    then subscribes to bars alone.
+    """
+
+    def __init__(self, symbols, url=None, on_bar=None, quotes=True):
+        self.url = url or STREAM_URL
+        self.symbols = list(symbols)
+        self.on_bar = on_bar
+        self.quotes = quotes
+        self._ws = None
+        self.latest = {}
+        self.versions = {}
+        self._cond = threading.Condition()
+        self._events = {}
+        self._thread = None
+
+    async def _connect(self):
+        async with websockets.connect(self.url) as ws:
+            await ws.recv()  # [{"T": "success", "msg": "connected"}]
+            await ws.send(json.dumps({
+                "action": "auth",
+                "key": client.config["alpaca-key"],
+                "secret": client.config["secret-key"],
+            }))
+            reply = json.loads(await ws.recv())
+            if reply[0].get("T") == "error":
+                raise RuntimeError(f"Stream authentication failed: {reply[0].get('msg')}")
+            await ws.send(self._subscription("subscribe", self.symbols))
+
+            self._ws = ws
+            try:
+                async for message in ws:
+                    for msg in json.loads(message):
+                        if msg.get("T") == "q":
+                            self._on_quote(msg)
+                        elif msg.get("T") == "b" and self.on_bar is not None:
+                            self.on_bar(msg)
+                        elif msg.get("T") == "error":
+                            print(f"Stream error: {msg.get('msg')}")
+            finally:
+                self._ws = None
+
+    def _subscription(self, action, symbols):
+        message = {"action": action}
+        if self.quotes:
+            message["quotes"] = symbols
+        if self.on_bar is not None:
+            message["bars"] = symbols
+        return json.dumps(message)
+
+    async def subscribe(self, symbols):
+        """Add symbols to the live subscription and to every later reconnect (stream's loop only)."""
+        symbols = [s for s in symbols if s not in self.symbols]
+        self.symbols += symbols
+        if symbols and self._ws is not None:
+            await self._ws.send(self._subscription("subscribe", symbols))
+
+    async def unsubscribe(self, symbols):
+        """Stop receiving quotes for symbols (stream's loop only)."""
+        self.symbols = [s for s in self.symbols if s not in symbols]
+        if symbols and self._ws is not None:
+            await self._ws.send(self._subscription("unsubscribe", list(symbols)))
+
+    async def run(self):
+        """Stay subscribed forever, reconnecting with backoff when the socket drops."""
+        self._events = {}  # Events belong to the loop that runs the stream
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                await self._connect()
+                delay = RECONNECT_DELAY
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Auth failures and malformed messages retry too, so wait() never hangs on a dead task
+                print(f"Quote stream disconnected: {e!r}. Reconnecting in {delay}s...")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def start(self):
+        """Run the subscriber on a background thread with its own event loop."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True)
+            self._thread.start()
+        return self
+
+    def _on_quote(self, msg):
+        symbol = msg["S"]
+        with self._cond:
+            self.latest[symbol] = msg
+            self.versions[symbol] = self.versions.get(symbol, 0) + 1
+            self._cond.notify_all()
+        event = self._events.get(symbol)
+        if event is not None:
+            event.set()
+
+    def wait_for_update(self, symbol, version=0, timeout=None):
+        """Block until a quote newer than version arrives; returns (quote, version).
+
+        On timeout the last known quote is returned with an unchanged version.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.versions.get(symbol, 0) > version, timeout)
+            return self.latest.get(symbol), self.versions.get(symbol, 0)
+
+    async def wait(self, symbol):
+        """Wait for the next quote for symbol (must be awaited on the stream's loop)."""
+        event = self._events.setdefault(symbol, asyncio.Event())
+        await event.wait()
+        event.clear()
+        return self.latest[symbol]
+
+
+class TradeUpdateStream:
+    """Listens to the account's trade_updates stream and hands each event to on_update."""
+
+    def __init__(self, on_update, url=None):
+        self.url = url or TRADE_STREAM_URL
+        self.on_update = on_update
+
+    async def _connect(self):
+        async with websockets.connect(self.url) as ws:
+            await ws.send(json.dumps({
+                "action": "authenticate",
+                "data": {"key_id": client.config["alpaca-key"], "secret_key": client.config["secret-key"]},
+            }))
+            reply = json.loads(await ws.recv())
+            if reply.get("data", {}).get("status") != "authorized":
+                raise RuntimeError(f"Trade stream authentication failed: {reply}")
+            await ws.send(json.dumps({"action": "listen", "data": {"streams": ["trade_updates"]}}))
+
+            async for message in ws:
+                msg = json.loads(message)
+                if msg.get("stream") == "trade_updates":
+                    self.on_update(msg["data"])
+
+    async def run(self):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                await self._connect()
+                delay = RECONNECT_DELAY
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Trade update stream disconnected: {e!r}. Reconnecting in {delay}s...")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
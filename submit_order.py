@@ -1,25 +1,5 @@
-import requests
-from dotenv import dotenv_values
-
-config = dotenv_values(".env")
+from orders import gateway
 
 def send_order(symbol, qty, side, type, time_in_force):
-    url = "https://paper-api.alpaca.markets/v2/orders"
-
-    payload = {
-        "side": side,
-        "type": type,
-        "time_in_force": "day",
-        "symbol": symbol,
-        "notional": qty
-    }
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "APCA-API-KEY-ID": config["alpaca-key"],
-        "APCA-API-SECRET-KEY": config["secret-key"]
-    }
-
-    response = requests.post(url, json=payload, headers=headers)
-    print(response.text)
-    return response.json()
\ No newline at end of file
+    """Submit a dollar-notional order through the shared order gateway."""
+    return gateway.submit_sync(symbol, side, type=type, time_in_force=time_in_force, notional=qty)
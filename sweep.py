@@ -0,0 +1,142 @@
+import itertools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+import rates
+from backtest_engine import run_backtest
+from costs import allocate_positions, calculate_transaction_costs, overnight_costs
+from events import load_events
+from price_store import FIELDS, Panel, PriceStore
+from result_cache import holding_draws
+from trades import TradeBuffer
+
+# === Parameters ===
+START_DATE = '2022-05-01'
+END_DATE = '2024-11-01'
+PORTFOLIO_SIZE = 5000000
+SEED = 42
+INDEXES = ['S&P 400', 'S&P 500', 'S&P 600', 'All']
+TRANSACTION_COSTS = [0.005, 0.01, 0.02]  # $ per share
+LONG_SPREADS = [0.01, 0.015, 0.02]  # Financing spread over fed funds
+HEDGE = [False, True]
+FED_SPREAD = 1.25  # Added to EFFR, as in the backtest scripts
+
+
+# === Shared-Memory Price Panel ===
+def _share_panel(panel):
+    """Copy each field into a shared memory block; returns (blocks, spec for workers)."""
+    blocks, spec = [], {}
+    for field in FIELDS:
+        array = np.ascontiguousarray(panel.fields[field])
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+        blocks.append(block)
+        spec[field] = (block.name, array.shape, array.dtype.str)
+    return blocks, spec
+
+
+_worker = {}
+
+
+def _attach(name):
+    # Only the parent owns the block, so workers must not register it with the resource
+    # tracker, which would otherwise warn about it, or unlink it, when a worker exits
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _init_worker(dates, tickers, spec, subsets, spy):
+    # Attach to the parent's blocks; the parent unlinks them when the sweep ends
+    blocks = {field: _attach(name) for field, (name, _, _) in spec.items()}
+    fields = {
+        field: np.ndarray(shape, dtype=np.dtype(dtype), buffer=blocks[field].buf)
+        for field, (_, shape, dtype) in spec.items()
+    }
+    _worker.update(blocks=blocks, panel=Panel(dates, tickers, fields), subsets=subsets, spy=spy)
+
+
+def _run_combination(index_name, cost_per_share, long_spread, hedge):
+    events, fed_rates, allocations, draws = _worker["subsets"][index_name]
+    results = run_backtest(
+        events, _worker["panel"], fed_rates, PORTFOLIO_SIZE,
+        partial(calculate_transaction_costs, cost_per_share=cost_per_share),
+        partial(overnight_costs, long_spread=long_spread),
+        spy=_worker["spy"] if hedge else None,
+        max_shares=allocations, draws=draws, out=TradeBuffer(capacity=len(events)),
+    )
+    pnl = results['Net PnL']
+    return {
+        'Index': index_name,
+        'Transaction Cost': cost_per_share,
+        'Long Spread': long_spread,
+        'Hedge': hedge,
+        'Trades': len(results),
+        'Net PnL': pnl.sum(),
+        'Total Profit': pnl[pnl > 0].sum(),
+        'Total Loss': pnl[pnl < 0].sum(),
+        'Winning Trades': int((pnl > 0).sum()),
+        'Losing Trades': int((pnl < 0).sum()),
+        'Hedge PnL': results['Hedge PnL'].sum(),
+    }
+
+
+# === Sweep Runner ===
+def _index_subsets(events, prices, indexes):
+    """Per index: its events, fed rates, ADV/capital share caps and holding draws, as interview.py sizes them."""
+    subsets = {}
+    for index_name in indexes:
+        subset = events.select(index=index_name)
+        fed_rates = rates.get_curve(START_DATE, END_DATE).lookup(pd.to_datetime(subset['Trade Date'])) + FED_SPREAD
+        subsets[index_name] = (subset, fed_rates, allocate_positions(prices, subset, PORTFOLIO_SIZE), holding_draws(subset, SEED))
+    return subsets
+
+
+def run_sweep(events, prices, spy, indexes=INDEXES, costs_per_share=TRANSACTION_COSTS,
+              long_spreads=LONG_SPREADS, hedge=HEDGE, workers=None):
+    """Run every grid combination in parallel and return one row per combination.
+
+    events is an EventTable. Trades are sized, costed and drawn exactly as in
+    interview.py, so a combination matches that script's run with the same
+    parameters. The price panel is placed in shared memory once and mapped by
+    every worker, so only the small per-index event tables are pickled to each
+    process.
+    """
+    grid = list(itertools.product(indexes, costs_per_share, long_spreads, hedge))
+    subsets = _index_subsets(events, prices, indexes)
+    blocks, spec = _share_panel(prices)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(prices.dates, prices.tickers, spec, subsets, spy),
+        ) as pool:
+            rows = list(pool.map(_run_combination, *zip(*grid)))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    events = load_events()
+    tickers = events.frame['Ticker'].unique().tolist()
+    store = PriceStore()
+    store.ensure(tickers + ['SPY'], START_DATE, END_DATE)
+    prices = store.panel(tickers, START_DATE, END_DATE)
+    spy = store.frame('SPY', START_DATE, END_DATE)
+
+    results = run_sweep(events, prices, spy)
+    results.to_csv('sweep_results.csv', index=False)
+    print(results.sort_values('Net PnL', ascending=False).to_string(index=False))
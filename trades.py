@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+TRADE_DTYPE = np.dtype([
+    ("ticker", np.int32),  # Index into TradeBuffer.tickers
+    ("entry_date", "datetime64[ns]"),
+    ("exit_date", "datetime64[ns]"),
+    ("holding_days", np.int32),
+    ("entry_price", np.float64),
+    ("exit_price", np.float64),
+    ("shares", np.float64),
+    ("pnl", np.float64),
+    ("hedge_pnl", np.float64),
+    ("net_pnl", np.float64),
+    ("transaction_costs", np.float64),
+])
+
+# Result-frame column for each field, in run_backtest's column order
+COLUMNS = {
+    "Ticker": "ticker",
+    "Entry Date": "entry_date",
+    "Exit Date": "exit_date",
+    "Holding Period (Days)": "holding_days",
+    "Entry Price": "entry_price",
+    "Exit Price": "exit_price",
+    "Shares": "shares",
+    "PnL": "pnl",
+    "Hedge PnL": "hedge_pnl",
+    "Net PnL": "net_pnl",
+    "Transaction Costs": "transaction_costs",
+}
+
+
+class TradeBuffer:
+    """Growable structured array of trades with fixed dtypes.
+
+    Rows are 80 bytes with the ticker stored as an id into self.tickers, and
+    capacity doubles when full, so appending batches of trades never builds
+    Python objects per trade. buffer["Net PnL"] etc. return column arrays, so
+    code written against a results frame's columns reads a buffer as well.
+    """
+
+    def __init__(self, capacity=1024, tickers=()):
+        self._data = np.empty(max(capacity, 1), dtype=TRADE_DTYPE)
+        self.size = 0
+        self.tickers = []
+        self._ids = {}
+        self.ticker_ids(tickers)
+
+    @classmethod
+    def from_frame(cls, results):
+        buffer = cls(capacity=len(results))
+        buffer.extend_frame(results)
+        return buffer
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, column):
+        return column in COLUMNS
+
+    def __getitem__(self, column):
+        values = self.records[COLUMNS.get(column, column)]
+        if column in ("Ticker", "ticker"):
+            return np.asarray(self.tickers, dtype=object)[values]
+        return values
+
+    @property
+    def records(self):
+        return self._data[:self.size]
+
+    def ticker_ids(self, names):
+        """Ids for ticker names, registering names not seen before."""
+        ids = np.empty(len(names), dtype=np.int32)
+        for i, name in enumerate(names):
+            if name not in self._ids:
+                self._ids[name] = len(self.tickers)
+                self.tickers.append(name)
+            ids[i] = self._ids[name]
+        return ids
+
+    def _reserve(self, n):
+        if self.size + n > len(self._data):
+            capacity = max(2 * len(self._data), self.size + n)
+            grown = np.empty(capacity, dtype=TRADE_DTYPE)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+
+    def extend(self, **fields):
+        """Append a batch of trades given as equal-length arrays per TRADE_DTYPE field.
+
+        ticker may be names or integer ids; fields left out are zero.
+        """
+        n = len(next(iter(fields.values())))
+        self._reserve(n)
+        block = self._data[self.size:self.size + n]
+        block[...] = np.zeros(1, dtype=TRADE_DTYPE)
+        for name, values in fields.items():
+            values = np.asarray(values)
+            if name == "ticker" and values.dtype.kind in "OUS":
+                codes, names = pd.factorize(values)
+                values = self.ticker_ids(list(names))[codes]
+            block[name] = values
+        self.size += n
+
+    def extend_frame(self, results):
+        """Append the rows of a run_backtest results frame."""
+        self.extend(**{field: results[column].to_numpy() for column, field in COLUMNS.items() if column in results})
+
+    def select(self, rows):
+        """New buffer with the trades picked by a boolean mask, index array or slice."""
+        records = self.records[rows]
+        buffer = TradeBuffer(capacity=len(records), tickers=self.tickers)
+        buffer._data[:len(records)] = records
+        buffer.size = len(records)
+        return buffer
+
+    def sorted(self, by="net_pnl", ascending=False):
+        """New buffer with the trades ordered by one field."""
+        order = np.argsort(self.records[COLUMNS.get(by, by)], kind="stable")
+        if not ascending:
+            order = order[::-1]
+        return self.select(order)
+
+    def to_frame(self):
+        """The trades as a results frame with run_backtest's columns."""
+        return pd.DataFrame({column: self[column] for column in COLUMNS})
+
+    def head(self, n=10):
+        """The first n trades as a results frame, for printing."""
+        return self.select(slice(0, n)).to_frame()